@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+This module saves how far a game log has been followed, so that a restarted
+tracker can carry on from there instead of replaying the whole log.
+
+A checkpoint records which file was read, by device, inode and a hash of its
+first bytes, and the byte offset reached in it. It's only used if the log at
+the same path is still the same file and hasn't shrunk below the offset.
+
+Functions:
+    checkpoint_path: Returns where the checkpoint for a log is saved.
+    identify: Returns what identifies an open file across restarts.
+    load: Returns the saved offset for an open log, if still valid.
+    save: Saves the offset for an open log.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from typing import IO, Any
+
+if sys.platform == "win32":
+    CHECKPOINT_DIR = os.path.join(
+        os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "all-slain"
+    )
+else:
+    CHECKPOINT_DIR = os.path.join(
+        os.environ.get("XDG_STATE_HOME", os.path.expanduser("~/.local/state")),
+        "all-slain",
+    )
+
+# Seconds between checkpoints while following
+CHECKPOINT_INTERVAL = 5.0
+
+# How much of the start of a file is hashed, in case its inode is reused
+HEAD_SIZE = 256
+
+
+def checkpoint_path(filepath: str, directory: str | None = None) -> str:
+    """
+    Args:
+        filepath: The log.
+        directory: Where checkpoints are kept. Defaults to CHECKPOINT_DIR.
+
+    Returns:
+        The path of the checkpoint for the log, one per absolute path.
+    """
+    key = hashlib.sha1(os.fsencode(os.path.abspath(filepath))).hexdigest()[:16]
+    return os.path.join(directory or CHECKPOINT_DIR, key + ".json")
+
+
+def identify(f: IO, head_size: int = HEAD_SIZE) -> dict[str, Any] | None:
+    """
+    Args:
+        f: An open file, which must have been opened by name.
+        head_size: How many bytes at the start of the file to hash.
+
+    Returns:
+        The device, inode and head hash of the file, or None if its path now
+        names another file.
+    """
+    stat = os.fstat(f.fileno())
+    try:
+        with open(f.name, "rb") as head_file:
+            if not os.path.samestat(os.fstat(head_file.fileno()), stat):
+                return None
+            head = head_file.read(head_size)
+    except OSError:
+        return None
+    return {
+        "dev": stat.st_dev,
+        "ino": stat.st_ino,
+        "head_size": len(head),
+        "head": hashlib.sha1(head).hexdigest(),
+    }
+
+
+def load(f: IO, directory: str | None = None) -> int | None:
+    """
+    Args:
+        f: The open log.
+        directory: Where checkpoints are kept. Defaults to CHECKPOINT_DIR.
+
+    Returns:
+        The saved offset for the log, or None if there's no checkpoint or it
+        was saved for a different file.
+    """
+    try:
+        with open(checkpoint_path(f.name, directory), "r", encoding="utf-8") as cp:
+            saved = json.load(cp)
+        identity = saved["identity"]
+        offset = saved["offset"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if identify(f, identity["head_size"]) != identity:
+        return None
+    if offset > os.fstat(f.fileno()).st_size:
+        return None
+    return offset
+
+
+def save(f: IO, offset: int, directory: str | None = None) -> bool:
+    """
+    Saves the offset for a log, replacing the previous checkpoint.
+
+    Args:
+        f: The open log; the file that `offset` is in.
+        offset: The byte offset to resume from.
+        directory: Where checkpoints are kept. Defaults to CHECKPOINT_DIR.
+
+    Returns:
+        True if the checkpoint was saved. Failing to save isn't an error, it
+        only means a restart will resume from an older checkpoint.
+    """
+    if (identity := identify(f)) is None:
+        return False
+    path = checkpoint_path(f.name, directory)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as cp:
+            json.dump({"identity": identity, "offset": offset}, cp)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        return False
+    return True
+
+
+# vim: set expandtab ts=4 sw=4
@@ -70,16 +70,26 @@ class Color(IntEnum):
         Returns:
             The colorized text
         """
+        # Precomputed below the class; a BLACK background is falsy, and ignored
+        index = (bg + 1 if bg else 0) * 4 + (2 if bold else 0) + (1 if bg_bold else 0)
+        return f"{self._sequences[index]}{text}\x1b[0m"
 
+    def _sequence(
+        self, bold: bool = False, bg: Self | None = None, bg_bold: bool = False
+    ) -> str:
+        """
+        Returns:
+            The ANSI escape sequence that __call__() puts in front of text.
+        """
         if not any([bold, bg, bg_bold]):
-            return f"{self.set()}{text}{self.reset()}"
+            return self.set()
 
         color_codes = [str(self.value + 30 + (60 if bold else 0))]
 
         if bg:
             color_codes.append(str(bg.value + 40 + (60 if bg_bold else 0)))
 
-        return f'\x1b[{";".join(color_codes)}m{text}\x1b[0m'
+        return f'\x1b[{";".join(color_codes)}m'
 
     def set(self, fg: bool = True, bg: bool = False, bold: bool = False) -> str:
         """
@@ -118,27 +128,7 @@ class Color(IntEnum):
             >>> Color.parse('(Rb)Red background (G)Green text (X) Back to normal')
             '\x1b[41mRed background \x1b[32mGreen text \x1b[0m Back to normal'
         """
-        color_map = {
-            "K": cls.BLACK,
-            "R": cls.RED,
-            "G": cls.GREEN,
-            "Y": cls.YELLOW,
-            "B": cls.BLUE,
-            "M": cls.MAGENTA,
-            "C": cls.CYAN,
-            "W": cls.WHITE,
-        }
-        tags = re.findall(r"\(([XKRGYBMCW][fb]?)\)", text)
-        for tag in tags:
-            if tag[0] == "X":
-                text = text.replace(f"({tag})", cls.reset())
-            else:
-                c = color_map[tag[0]]
-                if len(tag) == 2 and tag[1] == "b":
-                    text = text.replace(f"({tag})", c.set(fg=False, bg=True))
-                else:
-                    text = text.replace(f"({tag})", c.set())
-        return text
+        return RE_TAG.sub(lambda tag: TAG_SEQUENCES[tag[0]], text)
 
     @staticmethod
     def reset() -> str:
@@ -201,4 +191,41 @@ class Color(IntEnum):
         return text
 
 
+# Every sequence __call__() can start text with, for each color, indexed by
+# (bg + 1 if bg else 0) * 4 + (2 if bold else 0) + (1 if bg_bold else 0)
+for _color in Color:
+    _color._sequences = tuple(
+        _color._sequence(bold, bg, bg_bold)
+        for bg in (None, *Color)
+        for bold in (False, True)
+        for bg_bold in (False, True)
+    )
+del _color
+
+# The tags Color.parse() replaces, and what with
+RE_TAG = re.compile(r"\([XKRGYBMCW][fb]?\)")
+TAG_SEQUENCES = {
+    f"({letter}{kind})": (
+        Color.reset()
+        if letter == "X"
+        else color.set(fg=False, bg=True) if kind == "b" else color.set()
+    )
+    for letter, color in zip(
+        "XKRGYBMCW",
+        (
+            None,
+            Color.BLACK,
+            Color.RED,
+            Color.GREEN,
+            Color.YELLOW,
+            Color.BLUE,
+            Color.MAGENTA,
+            Color.CYAN,
+            Color.WHITE,
+        ),
+    )
+    for kind in ("", "f", "b")
+}
+
+
 # vim: set expandtab ts=4 sw=4
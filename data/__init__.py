@@ -1,7 +1,104 @@
-from .locations import LOCATIONS
-from .ships import SHIPS
-from .weapons_fps import WEAPONS_FPS
-from .weapons_ship import WEAPONS_SHIP
+"""
+The game data tables, loaded on first access.
+
+Each table is a dict in its own module, but importing them all is most of
+the cost of importing this package, so it's put off until one of them is
+used. They're then all read at once from SNAPSHOT, a marshal dump of them,
+if there's an up to date one, or imported otherwise. main.spec makes one
+with save_snapshot() in its build directory, and bundles it.
+
+Functions:
+    load: Returns every table, by name.
+    save_snapshot: Writes the tables to SNAPSHOT.
+"""
+
+import marshal
+import os
+import sys
+from typing import Any
+
+# The tables, and the modules they're defined in
+TABLES = {
+    "LOCATIONS": "locations",
+    "SHIPS": "ships",
+    "WEAPONS_FPS": "weapons_fps",
+    "WEAPONS_SHIP": "weapons_ship",
+}
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT = os.path.join(DATA_DIR, "tables.marshal")
+
+
+def _read_snapshot(path: str) -> dict[str, dict[str, str]] | None:
+    """
+    Returns:
+        The tables in the snapshot, or None if it's missing, unreadable, or
+        older than any of the modules it was made from. The modules aren't
+        checked in a frozen build, which only has the snapshot it was built
+        with.
+    """
+    try:
+        with open(path, "rb") as f:
+            saved = os.fstat(f.fileno()).st_mtime
+            snapshot = f.read()
+        if not getattr(sys, "frozen", False):
+            for module in TABLES.values():
+                source = os.path.join(DATA_DIR, module + ".py")
+                if os.path.exists(source) and os.stat(source).st_mtime > saved:
+                    return None
+        tables = marshal.loads(snapshot)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if not isinstance(tables, dict) or tables.keys() != TABLES.keys():
+        return None
+    return tables
+
+
+def _import_tables() -> dict[str, dict[str, str]]:
+    # Imported by name rather than through TABLES, so that PyInstaller finds
+    # them when building from main.py alone
+    from . import locations, ships, weapons_fps, weapons_ship
+
+    return {
+        "LOCATIONS": locations.LOCATIONS,
+        "SHIPS": ships.SHIPS,
+        "WEAPONS_FPS": weapons_fps.WEAPONS_FPS,
+        "WEAPONS_SHIP": weapons_ship.WEAPONS_SHIP,
+    }
+
+
+def load(path: str = SNAPSHOT) -> dict[str, dict[str, str]]:
+    """
+    Loads the tables, and makes them attributes of this package so that
+    they're only loaded once.
+
+    Args:
+        path: The snapshot to read them from, if it's up to date.
+
+    Returns:
+        Every table, by name.
+    """
+    tables = _read_snapshot(path) or _import_tables()
+    globals().update(tables)
+    return tables
+
+
+def save_snapshot(path: str = SNAPSHOT) -> None:
+    """Writes the tables, as defined in their modules, to a snapshot."""
+    data = marshal.dumps(_import_tables())
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def __getattr__(name: str) -> Any:
+    if name in TABLES:
+        return load()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *TABLES])
 
 
 __all__ = [
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+This module provides a table of names, such as the killers, victims, zones
+and weapons of a session's events, that gives each distinct name a small
+integer ID.
+
+A session has a few hundred entities, zones and weapons, each named in many
+events. Keeping events as IDs into a table stores each name once, and lets
+them be counted or compared as integers. A function of a name, such as a
+clean_* function, only needs to be applied once per ID.
+
+Classes:
+    EntityTable: Interns names to small integer IDs.
+"""
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class EntityTable:
+    """
+    Gives each distinct name an ID, in the order they're first interned, and
+    keeps a single copy of it.
+
+    Attributes:
+        names: Each name, indexed by its ID.
+        ids: The ID of each name.
+        results: For each function given to apply(), its result for each ID
+            it was applied to.
+
+    Args:
+        names: Names to intern first, in order.
+    """
+
+    __slots__ = ("names", "ids", "results")
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.names: list[str] = []
+        self.ids: dict[str, int] = {}
+        self.results: dict[Callable[[str], Any], dict[int, Any]] = {}
+        for name in names:
+            self.intern(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.ids
+
+    def __getitem__(self, entity_id: int) -> str:
+        return self.names[entity_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def intern(self, name: str) -> int:
+        """
+        Returns:
+            The ID of the name, adding it to the table if it's new.
+        """
+        if (entity_id := self.ids.get(name)) is None:
+            entity_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return entity_id
+
+    def canonical(self, name: str) -> str:
+        """
+        Returns:
+            The copy of the name kept in the table, so that every event that
+            names it refers to the same string.
+        """
+        return self.names[self.intern(name)]
+
+    def apply(self, func: Callable[[str], T], name: str) -> T:
+        """
+        Returns:
+            The result of a function of the name, such as a clean_* function,
+            which is only called the first time for each name.
+        """
+        entity_id = self.intern(name)
+        if (results := self.results.get(func)) is None:
+            results = self.results[func] = {}
+        try:
+            return results[entity_id]
+        except KeyError:
+            result = results[entity_id] = func(self.names[entity_id])
+            return result
+
+    def map(self, func: Callable[[str], str]) -> tuple["EntityTable", array]:
+        """
+        Applies a function, such as a clean_* function, once to each name
+        rather than once to each event.
+
+        Returns:
+            A tuple (results, ids) where:
+            - results: the distinct results, in their own table
+            - ids: the ID in `results` of the result for each ID in this table
+        """
+        results = EntityTable()
+        intern = results.intern
+        return (results, array("I", [intern(func(name)) for name in self.names]))
+
+
+# vim: set expandtab ts=4 sw=4
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+This module provides a record type for each kind of event SCLogParser finds,
+holding the fields of the event as parsed from the log, without cleaning up
+names or formatting anything.
+
+Rendering events for display is a separate stage, so that anything that only
+needs the events, or renders them some other way, doesn't pay for it.
+
+Classes:
+    Event: The base of every event record.
+    ContextEstablisherTask: A loading step finished, or is taking long.
+    ActorDeath: An actor was killed.
+    VehicleDestruction: A vehicle was disabled or destroyed.
+    Respawn: A player is respawning at a hospital.
+    Spawn: The character spawned.
+    Connecting: Connecting to a server.
+    Connected: Connected to a server.
+    Loading: The loading screen opened.
+    Loaded: The loading screen closed.
+    QuitLobby: A player quit the game session.
+    Incap: A player was incapacitated.
+    Jump: A player jumped to another system.
+    Quit: The game quit.
+    QuantumTravel: A player started quantum travel.
+
+Functions:
+    make_event: Returns the record for the fields of an event, optionally with
+        its names interned in an EntityTable.
+    field_names: Returns the names of the fields of an event type.
+    name_indexes: Returns the positions of the names among those fields.
+"""
+
+import dataclasses
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cache
+from typing import ClassVar
+
+from entity_table import EntityTable
+
+LOG_INCAP_CAUSE = re.compile(r"([\w\d]+) \((\d.\d+) damage\)(?:, )?")
+
+
+@dataclass(slots=True)
+class Event:
+    """
+    Attributes:
+        event_type: The key of the pattern in SCLogParser.PATTERNS.
+        names: The fields that name an entity, a place or an item, which
+            repeat from event to event.
+        timestamp: When the event was logged.
+    """
+
+    event_type: ClassVar[str] = ""
+    names: ClassVar[tuple[str, ...]] = ()
+    timestamp: datetime
+
+    @classmethod
+    def from_fields(cls, timestamp: datetime, fields: tuple[str, ...]) -> "Event":
+        """Makes the event from the fields its pattern captured."""
+        return cls(timestamp, *fields)
+
+
+@dataclass(slots=True)
+class ContextEstablisherTask(Event):
+    event_type: ClassVar[str] = "CET"
+    finished: bool
+    taskname: str
+    state: str
+    step: int
+    running_time: float
+
+    @classmethod
+    def from_fields(
+        cls, timestamp: datetime, fields: tuple[str, ...]
+    ) -> "ContextEstablisherTask":
+        kind, taskname, state, step, running_time = fields
+        return cls(
+            timestamp,
+            kind == "ContextEstablisherTaskFinished",
+            taskname,
+            state,
+            int(step),
+            float(running_time),
+        )
+
+
+@dataclass(slots=True)
+class ActorDeath(Event):
+    event_type: ClassVar[str] = "KILLP"
+    names: ClassVar[tuple[str, ...]] = ("killed", "zone", "killer", "weapon")
+    killed: str
+    zone: str
+    killer: str
+    weapon: str
+    damage_type: str
+    direction: str
+
+
+@dataclass(slots=True)
+class VehicleDestruction(Event):
+    event_type: ClassVar[str] = "KILLV"
+    names: ClassVar[tuple[str, ...]] = ("vehicle", "zone", "driver", "killer")
+    vehicle: str
+    zone: str
+    driver: str
+    destroy_level: int
+    killer: str
+    damage_type: str
+
+    @classmethod
+    def from_fields(
+        cls, timestamp: datetime, fields: tuple[str, ...]
+    ) -> "VehicleDestruction":
+        vehicle, zone, driver, destroy_level, killer, damage_type = fields
+        return cls(
+            timestamp, vehicle, zone, driver, int(destroy_level), killer, damage_type
+        )
+
+
+@dataclass(slots=True)
+class Respawn(Event):
+    event_type: ClassVar[str] = "RESPAWN"
+    names: ClassVar[tuple[str, ...]] = ("player", "location")
+    player: str
+    location: str
+
+
+@dataclass(slots=True)
+class Spawn(Event):
+    event_type: ClassVar[str] = "SPAWN"
+
+
+@dataclass(slots=True)
+class Connecting(Event):
+    event_type: ClassVar[str] = "CONNECTING"
+
+
+@dataclass(slots=True)
+class Connected(Event):
+    event_type: ClassVar[str] = "CONNECTED"
+
+
+@dataclass(slots=True)
+class Loading(Event):
+    event_type: ClassVar[str] = "LOADING"
+
+
+@dataclass(slots=True)
+class Loaded(Event):
+    event_type: ClassVar[str] = "LOADED"
+    names: ClassVar[tuple[str, ...]] = ("item",)
+    item: str
+    load_time: float
+
+    @classmethod
+    def from_fields(cls, timestamp: datetime, fields: tuple[str, ...]) -> "Loaded":
+        item, load_time = fields
+        return cls(timestamp, item, float(load_time))
+
+
+@dataclass(slots=True)
+class QuitLobby(Event):
+    event_type: ClassVar[str] = "QUITLOBBY"
+    names: ClassVar[tuple[str, ...]] = ("player",)
+    player: str
+
+
+@dataclass(slots=True)
+class Incap(Event):
+    """
+    Attributes:
+        causes: Each cause, and how much damage it did.
+    """
+
+    event_type: ClassVar[str] = "INCAP"
+    names: ClassVar[tuple[str, ...]] = ("player",)
+    player: str
+    causes: tuple[tuple[str, float], ...]
+
+    @classmethod
+    def from_fields(cls, timestamp: datetime, fields: tuple[str, ...]) -> "Incap":
+        player, causes = fields
+        return cls(
+            timestamp,
+            player,
+            tuple(
+                (cause, float(damage))
+                for cause, damage in LOG_INCAP_CAUSE.findall(causes)
+            ),
+        )
+
+
+@dataclass(slots=True)
+class Jump(Event):
+    event_type: ClassVar[str] = "JUMP"
+    names: ClassVar[tuple[str, ...]] = ("player", "origin", "destination")
+    player: str
+    origin: str
+    destination: str
+
+
+@dataclass(slots=True)
+class Quit(Event):
+    event_type: ClassVar[str] = "QUIT"
+
+
+@dataclass(slots=True)
+class QuantumTravel(Event):
+    event_type: ClassVar[str] = "QUANTUM"
+    names: ClassVar[tuple[str, ...]] = ("player", "destination")
+    player: str
+    destination: str
+
+
+# The record class for each event type
+EVENT_CLASSES: dict[str, type[Event]] = {
+    cls.event_type: cls
+    for cls in (
+        ContextEstablisherTask,
+        ActorDeath,
+        VehicleDestruction,
+        Respawn,
+        Spawn,
+        Connecting,
+        Connected,
+        Loading,
+        Loaded,
+        QuitLobby,
+        Incap,
+        Jump,
+        Quit,
+        QuantumTravel,
+    )
+}
+
+
+def make_event(
+    event_type: str,
+    fields: tuple[str, ...],
+    timestamp: datetime,
+    entities: EntityTable | None = None,
+) -> Event:
+    """
+    Args:
+        event_type: The key of the pattern that matched.
+        fields: The fields captured by that pattern.
+        timestamp: The timestamp of the event.
+        entities: If given, the names in the fields are replaced with the
+            copies kept in it, so that every event naming the same entity
+            refers to one string.
+
+    Returns:
+        The record for the event.
+    """
+    cls = EVENT_CLASSES[event_type]
+    if entities is not None and (indexes := name_indexes(cls)):
+        canonical = entities.canonical
+        fields = tuple(
+            canonical(field) if i in indexes else field
+            for i, field in enumerate(fields)
+        )
+    return cls.from_fields(timestamp, fields)
+
+
+@cache
+def field_names(cls: type[Event]) -> tuple[str, ...]:
+    """
+    Returns:
+        The names of the fields of an event type, in order, other than the
+        timestamp every event has.
+    """
+    return tuple(
+        field.name for field in dataclasses.fields(cls) if field.name != "timestamp"
+    )
+
+
+@cache
+def name_indexes(cls: type[Event]) -> frozenset[int]:
+    """
+    Returns:
+        The positions of the fields in `names` among the fields of the event
+        type, as captured by its pattern.
+    """
+    return frozenset(field_names(cls).index(name) for name in cls.names)
+
+
+# vim: set expandtab ts=4 sw=4
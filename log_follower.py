@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+This module provides functions for following a game log while the game is
+still writing to it.
+
+Classes:
+    PollWatcher: Waits for a file to grow by polling, with adaptive backoff.
+    InotifyWatcher: Waits for a file to change using Linux inotify.
+    Follower: Reads the lines of a file as they are written, across rotations,
+        with either `for` or `async for`.
+
+Functions:
+    watch: Returns the best watcher available for a file.
+    follow: Yields the lines of a file as they are written.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import AsyncGenerator, Callable, Generator
+from operator import length_hint
+from typing import Any, BinaryIO, NoReturn
+
+from log_parser import LOG_ENCODING, LOG_NEWLINE
+
+# Polling starts this often after new data, and backs off to MAX_DELAY when idle
+MIN_DELAY = 0.01
+MAX_DELAY = 1.0
+
+# The most a Follower reads at once
+BLOCK_SIZE = 64 * 1024
+
+
+class PollWatcher:
+    """
+    Waits for more data by sleeping, doubling the delay each time nothing new
+    was written, from MIN_DELAY up to MAX_DELAY.
+    """
+
+    def __init__(self) -> None:
+        self.delay = MIN_DELAY
+
+    def wait(self) -> None:
+        """Sleeps for the current delay, and backs off for the next wait."""
+        time.sleep(self.delay)
+        self.delay = min(self.delay * 2, MAX_DELAY)
+
+    async def wait_async(self) -> None:
+        """Like wait(), without blocking the event loop."""
+        await asyncio.sleep(self.delay)
+        self.delay = min(self.delay * 2, MAX_DELAY)
+
+    def reset(self) -> None:
+        """Goes back to polling quickly; called when new data was read."""
+        self.delay = MIN_DELAY
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Waits for a file to be written to, using Linux inotify.
+
+    The directory is watched rather than the file, so that the watch survives
+    the file being moved away and created again when the game restarts.
+
+    Raises:
+        OSError: If inotify isn't available or the directory can't be watched.
+    """
+
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    IN_MODIFY = 0x2
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    # struct inotify_event, followed by `len` bytes of name
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, filepath: str) -> None:
+        directory, name = os.path.split(os.path.abspath(filepath))
+        self.name = os.fsencode(name)
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = (
+            self.IN_MODIFY
+            | self.IN_ATTRIB
+            | self.IN_CLOSE_WRITE
+            | self.IN_MOVED_FROM
+            | self.IN_MOVED_TO
+            | self.IN_CREATE
+            | self.IN_DELETE
+            | self.IN_DELETE_SELF
+            | self.IN_MOVE_SELF
+        )
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, "inotify_add_watch failed", directory)
+
+    def wait(self) -> None:
+        """
+        Blocks until the file changes, or for at most MAX_DELAY in case a
+        change isn't reported (e.g. on network filesystems).
+        """
+        deadline = time.monotonic() + MAX_DELAY
+        while (timeout := deadline - time.monotonic()) > 0:
+            if not select.select([self.fd], [], [], timeout)[0]:
+                return
+            if self._read_events():
+                return
+
+    async def wait_async(self) -> None:
+        """Like wait(), without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + MAX_DELAY
+        while (timeout := deadline - loop.time()) > 0:
+            readable = loop.create_future()
+            loop.add_reader(
+                self.fd, lambda: readable.done() or readable.set_result(None)
+            )
+            try:
+                await asyncio.wait_for(readable, timeout)
+            except asyncio.TimeoutError:
+                return
+            finally:
+                loop.remove_reader(self.fd)
+            if self._read_events():
+                return
+
+    def _read_events(self) -> bool:
+        """
+        Drains the queued events; one wakeup covers them all.
+
+        Returns:
+            True if any of them was about the watched file, or about the
+            directory itself.
+        """
+        found = False
+        try:
+            while data := os.read(self.fd, 4096):
+                offset = 0
+                while offset < len(data):
+                    _, _, _, length = self.EVENT.unpack_from(data, offset)
+                    offset += self.EVENT.size
+                    name = data[offset : offset + length].rstrip(b"\0")
+                    offset += length
+                    found = found or not name or name == self.name
+        except BlockingIOError:
+            pass
+        return found
+
+    def reset(self) -> None:
+        pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def watch(filepath: str) -> PollWatcher | InotifyWatcher:
+    """
+    Returns:
+        An InotifyWatcher for the file on Linux, or a PollWatcher where
+        inotify isn't available.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(filepath)
+        except (OSError, AttributeError):
+            # AttributeError: libc without inotify functions
+            pass
+    return PollWatcher()
+
+
+class Follower:
+    """
+    Reads the lines of a file, then waits for more to be written.
+
+    The file is read in blocks of up to BLOCK_SIZE bytes. A line is only
+    returned once its LOG_NEWLINE has been written; until then, the part
+    already written is held back.
+
+    When the file is moved away and a new one is created in its place, as the
+    game does when it restarts, the rest of the old file is read and then the
+    new one is followed from the start. When it is truncated, it's followed
+    from the start again. A file that is replaced again before the previous
+    replacement was noticed is missed.
+
+    With `async for`, waiting doesn't block the event loop, so one thread can
+    follow several files.
+
+    Attributes:
+        file: The file being read; a different one after a rotation.
+
+    Args:
+        f: The open file, in binary mode. It isn't closed, but files opened
+            after a rotation are.
+        watcher: How to wait for more data. Defaults to watch(f.name).
+        on_idle: Called each time every line written so far has been
+            returned, before waiting for more.
+    """
+
+    def __init__(
+        self,
+        f: BinaryIO,
+        watcher: PollWatcher | InotifyWatcher | None = None,
+        on_idle: Callable[[], object] | None = None,
+    ) -> None:
+        self.opened = f
+        self.file = f
+        self.watcher = watcher or watch(f.name)
+        self.on_idle = on_idle
+        # The start of a line that hasn't been completely written yet
+        self.pending = ""
+        # The lines of the last block read, the ones not returned yet, and
+        # the offset just past them
+        self.lines: list[str] = []
+        self.remaining = iter(self.lines)
+        self.end = f.tell()
+
+    @property
+    def offset(self) -> int:
+        """The byte offset in `file` just past the last line returned."""
+        unread = self.lines[len(self.lines) - length_hint(self.remaining) :]
+        # One byte per character in the log's encoding
+        return self.end - sum(map(len, unread))
+
+    def __iter__(self) -> Generator[str, Any, NoReturn]:
+        waited = False
+        try:
+            while True:
+                for line in self.poll():
+                    if waited:
+                        self.watcher.reset()
+                        waited = False
+                    yield line
+                if self.on_idle:
+                    self.on_idle()
+                self.watcher.wait()
+                waited = True
+        finally:
+            self.close()
+
+    async def __aiter__(self) -> AsyncGenerator[str, None]:
+        """Like iterating, without blocking the event loop while waiting."""
+        waited = False
+        try:
+            while True:
+                for line in self.poll():
+                    if waited:
+                        self.watcher.reset()
+                        waited = False
+                    yield line
+                if self.on_idle:
+                    self.on_idle()
+                await self.watcher.wait_async()
+                waited = True
+        finally:
+            self.close()
+
+    def poll(self) -> Generator[str, Any, None]:
+        """
+        Yields the lines that have been completely written since the last
+        call, switching to a new file if the file was replaced, then returns.
+        """
+        while True:
+            yield from self._read()
+            try:
+                stat = os.stat(self.file.name)
+            except FileNotFoundError:
+                # Moved away, and the new file isn't there yet
+                return
+            if not os.path.samestat(stat, os.fstat(self.file.fileno())):
+                # Lines may have been written between the last read and the stat
+                yield from self._read()
+                if self.pending:
+                    # Nothing more will be written to finish it
+                    line, self.pending = self.pending, ""
+                    yield line
+                replacement = open(self.file.name, "rb")
+                if self.file is not self.opened:
+                    self.file.close()
+                self.file = replacement
+                self._restart()
+            elif stat.st_size < self.file.tell():
+                self.file.seek(0)
+                self._restart()
+            else:
+                return
+
+    def _read(self) -> Generator[str, Any, None]:
+        """Yields the complete lines up to the end of the file."""
+        while data := self.file.read(BLOCK_SIZE):
+            lines = (self.pending + data.decode(LOG_ENCODING)).split(LOG_NEWLINE)
+            self.pending = lines.pop()
+            self.lines = [line + LOG_NEWLINE for line in lines]
+            self.remaining = iter(self.lines)
+            self.end = self.file.tell() - len(self.pending)
+            yield from self.remaining
+
+    def _restart(self) -> None:
+        """Forgets what was read, after going back to the start of a file."""
+        self.pending = ""
+        self.lines = []
+        self.remaining = iter(self.lines)
+        self.end = 0
+
+    def close(self) -> None:
+        """Stops watching, and closes any file opened after a rotation."""
+        self.watcher.close()
+        if self.file is not self.opened:
+            self.file.close()
+
+
+def follow(
+    f: BinaryIO, watcher: PollWatcher | InotifyWatcher | None = None
+) -> Generator[str, Any, NoReturn]:
+    """
+    Yields the lines of a file, then waits for more to be written.
+
+    Args:
+        f: The open file, in binary mode.
+        watcher: How to wait for more data. Defaults to watch(f.name).
+
+    See Follower for how rotation and truncation are handled.
+    """
+    return iter(Follower(f, watcher))
+
+
+# vim: set expandtab ts=4 sw=4
@@ -1,56 +1,389 @@
 #!/usr/bin/env python3
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+import mmap
 import re
+from collections.abc import Generator, Iterable
+
+from entity_table import EntityTable
+from events import Event, make_event
+
+LOG_ENCODING = "latin-1"
+LOG_NEWLINE = "\r\n"
+LOG_NEWLINE_BYTES = LOG_NEWLINE.encode(LOG_ENCODING)
+
+# Length of the "<2024-12-23T00:00:00.000Z> " prefix on every timestamped line
+PREFIX_LEN = 27
+
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
 
 
 class SCLogParser:
+    # Matched from PREFIX_LEN onwards; the timestamp is handled by parse_timestamp()
     PATTERNS = {
         "CET": re.compile(
-            r'<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[Notice\] <(ContextEstablisherTaskFinished|CContextEstablisherTaskLongWait)> establisher="\w+" message="[\w\s]+" taskname="([\w\.]+)" state=eCVS_(\w+)\((\d+)\) status="\w+" runningTime=(\d+\.\d).*'
+            r'\[Notice\] <(ContextEstablisherTaskFinished|CContextEstablisherTaskLongWait)> establisher="\w+" message="[\w\s]+" taskname="([\w\.]+)" state=eCVS_(\w+)\((\d+)\) status="\w+" runningTime=(\d+\.\d).*'
         ),
         "KILLP": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[Notice\] <Actor Death> CActor::Kill: '([\w-]+)' \[\d+\] in zone '([\w-]+)' killed by '([\w-]+)' \[\d+\] using '[\w-]+' \[Class ([\w-]+)\] with damage type '([A-Za-z]+)' from direction (.*) \[Team_ActorTech\]\[Actor\]"
+            r"\[Notice\] <Actor Death> CActor::Kill: '([\w-]+)' \[\d+\] in zone '([\w-]+)' killed by '([\w-]+)' \[\d+\] using '[\w-]+' \[Class ([\w-]+)\] with damage type '([A-Za-z]+)' from direction (.*) \[Team_ActorTech\]\[Actor\]"
         ),
         "KILLV": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[Notice\] <Vehicle Destruction> CVehicle::OnAdvanceDestroyLevel: Vehicle '([\w-]+)' \[\d+\] in zone '([\w-]+)' \[pos.*\] driven by '([\w-]+)' \[\d+\] advanced from destroy level \d to (\d) caused by '([\w-]+)' \[[0-9_]+\] with '([A-Za-z]+)' \[Team_VehicleFeatures\]\[Vehicle\]"
+            r"\[Notice\] <Vehicle Destruction> CVehicle::OnAdvanceDestroyLevel: Vehicle '([\w-]+)' \[\d+\] in zone '([\w-]+)' \[pos.*\] driven by '([\w-]+)' \[\d+\] advanced from destroy level \d to (\d) caused by '([\w-]+)' \[[0-9_]+\] with '([A-Za-z]+)' \[Team_VehicleFeatures\]\[Vehicle\]"
         ),
         "RESPAWN": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[Notice\] <Corpse> Player '([\w-]+)' <(?:remote|local) client>: DoesLocationContainHospital: Searching landing zone location \"(.*)\" for the closest hospital. \[Team_ActorTech\]\[Actor\]"
-        ),
-        "SPAWN": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[CSessionManager::OnClientSpawned\] Spawned!"
-        ),
-        "CONNECTING": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[CSessionManager::ConnectCmd\] Connect started!"
-        ),
-        "CONNECTED": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[CSessionManager::OnClientConnected\] Connected!"
+            r"\[Notice\] <Corpse> Player '([\w-]+)' <(?:remote|local) client>: DoesLocationContainHospital: Searching landing zone location \"(.*)\" for the closest hospital. \[Team_ActorTech\]\[Actor\]"
         ),
+        "SPAWN": re.compile(r"\[CSessionManager::OnClientSpawned\] Spawned!"),
+        "CONNECTING": re.compile(r"\[CSessionManager::ConnectCmd\] Connect started!"),
+        "CONNECTED": re.compile(r"\[CSessionManager::OnClientConnected\] Connected!"),
         "LOADING": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[CGlobalGameUI::OpenLoadingScreen\] Request context transition to LoadingScreenView"
+            r"\[CGlobalGameUI::OpenLoadingScreen\] Request context transition to LoadingScreenView"
         ),
         "LOADED": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> Loading screen for (\w+) : SC_Frontend closed after (\d+.\d+) seconds"
+            r"Loading screen for (\w+) : SC_Frontend closed after (\d+.\d+) seconds"
         ),
         "QUITLOBBY": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[Notice\] <\[EALobby\] EALobbyQuit> \[EALobby\]\[CEALobby::RequestQuitLobby\] ([\w-]+) Requesting QuitLobby.*"
-        ),
-        "INCAP": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> Logged an incap\.! nickname: ([\w-]+), causes: \[(.+)\]"
+            r"\[Notice\] <\[EALobby\] EALobbyQuit> \[EALobby\]\[CEALobby::RequestQuitLobby\] ([\w-]+) Requesting QuitLobby.*"
         ),
+        "INCAP": re.compile(r"Logged an incap\.! nickname: ([\w-]+), causes: \[(.+)\]"),
         "JUMP": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[Notice\] <Changing Solar System>.* Client entity ([\w-]*) .* changing system from ([\w-]*) to ([A-Za-z0-9]*) .*"
-        ),
-        "QUIT": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[Notice\] <SystemQuit> CSystem::Quit invoked .+"
+            r"\[Notice\] <Changing Solar System>.* Client entity ([\w-]*) .* changing system from ([\w-]*) to ([A-Za-z0-9]*) .*"
         ),
+        "QUIT": re.compile(r"\[Notice\] <SystemQuit> CSystem::Quit invoked .+"),
         "QUANTUM": re.compile(
-            r"<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}).\d{3}Z> \[Notice\] <Quantum Navtarget> CSCItemQuantumDrive::RmMulticastOnQTToPoint : Local client user ([\w-]*)\[\d{12}\] received QT data for Entity:\w+_\d{12,}\[\d{12,}\] to Target (\w+).*"
+            r"\[Notice\] <Quantum Navtarget> CSCItemQuantumDrive::RmMulticastOnQTToPoint : Local client user ([\w-]*)\[\d{12}\] received QT data for Entity:\w+_\d{12,}\[\d{12,}\] to Target (\w+).*"
         ),
     }
 
+    # Event type codes used by parse_lines()
+    EVENT_TYPES = tuple(PATTERNS)
+    EVENT_CODES = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+    # The tag that identifies each event, as returned by get_tag().
+    # Anything that isn't listed here can't match any of the PATTERNS.
+    TAGS = {
+        "<ContextEstablisherTaskFinished>": "CET",
+        "<CContextEstablisherTaskLongWait>": "CET",
+        "<Actor Death>": "KILLP",
+        "<Vehicle Destruction>": "KILLV",
+        "<Corpse>": "RESPAWN",
+        "[CSessionManager::OnClientSpawned]": "SPAWN",
+        "[CSessionManager::ConnectCmd]": "CONNECTING",
+        "[CSessionManager::OnClientConnected]": "CONNECTED",
+        "[CGlobalGameUI::OpenLoadingScreen]": "LOADING",
+        "Loading": "LOADED",
+        "<[EALobby] EALobbyQuit>": "QUITLOBBY",
+        "Logged": "INCAP",
+        "<Changing Solar System>": "JUMP",
+        "<SystemQuit>": "QUIT",
+        "<Quantum Navtarget>": "QUANTUM",
+    }
+
+    # The same patterns and tags for parsing undecoded lines. Field values are
+    # ASCII in practice; \w and \s only match ASCII characters here.
+    PATTERNS_BYTES = {
+        event_type: re.compile(regex.pattern.encode(LOG_ENCODING))
+        for event_type, regex in PATTERNS.items()
+    }
+    TAGS_BYTES = {
+        tag.encode(LOG_ENCODING): event_type for tag, event_type in TAGS.items()
+    }
+    # Finds the start of every following line that has one of the TAGS_BYTES,
+    # so iter_bytes() never looks at the other lines in Python
+    FIND_TAGS_BYTES = re.compile(
+        rb"\r\n<.{24}> (?:\[Notice\] )?("
+        + rb"|".join(
+            re.escape(tag) + (rb"" if tag[:1] in b"<[" else rb"(?= )")
+            for tag in TAGS_BYTES
+        )
+        + rb")"
+    )
+
+    @staticmethod
+    def get_tag(line: str) -> str:
+        """
+        Extracts the event tag from a log line without running a regex.
+
+        The tag is the first `<...>` or `[...]` token after the timestamp (and
+        after `[Notice]`, if present), or the first word otherwise.
+
+        Returns:
+            The tag, or an empty string if the line is too short to have one.
+        """
+        pos = PREFIX_LEN
+        if line.startswith("[Notice] ", pos):
+            pos += 9
+        first = line[pos : pos + 1]
+        if first == "<":
+            end = line.find(">", pos) + 1
+        elif first == "[":
+            end = line.find("]", pos) + 1
+        else:
+            end = line.find(" ", pos)
+        return line[pos:end] if end > pos else ""
+
+    # Lines whose tag selected each pattern, split by whether the pattern matched
+    hits: Counter[str] = Counter()
+    misses: Counter[str] = Counter()
+
+    # Most events arrive in bursts within the same second
+    _last_second = ""
+    _last_time = datetime.min
+
+    @classmethod
+    def parse_timestamp(cls, line: str) -> datetime | None:
+        """
+        Parses the fixed-width `<2024-12-23T00:00:00.000Z> ` prefix of a line.
+
+        The date and time are only parsed when the second changes; the cached
+        value is reused for every other line in the same second.
+
+        Returns:
+            The timestamp, including milliseconds, or None if the line doesn't
+            start with a timestamp.
+        """
+        if (
+            line[24:27] != "Z> "
+            or line[0] != "<"
+            or line[11] != "T"
+            or line[20] != "."
+            or not line[21:24].isdecimal()
+        ):
+            return None
+        second = line[1:20]
+        if second != cls._last_second:
+            try:
+                cls._last_time = datetime.fromisoformat(second)
+            except ValueError:
+                return None
+            cls._last_second = second
+        return cls._last_time.replace(microsecond=int(line[21:24]) * 1000)
+
+    @classmethod
+    def find_match(cls, line: str) -> tuple[str, re.Match, datetime] | None:
+        """
+        Returns:
+            A tuple (event_type, match, timestamp) where:
+            - event_type: the key of the pattern that matched
+            - match: the match of that pattern against the rest of the line
+            - timestamp: the timestamp of the line
+        """
+        # At most one pattern can match a given tag, so only that one is tried
+        if (event_type := cls.TAGS.get(cls.get_tag(line))) is None:
+            return None
+        if (timestamp := cls.parse_timestamp(line)) is not None and (
+            match := cls.PATTERNS[event_type].match(line, PREFIX_LEN)
+        ):
+            cls.hits[event_type] += 1
+            return (event_type, match, timestamp)
+        cls.misses[event_type] += 1
+        return None
+
+    @classmethod
+    def parse_event(cls, line: str) -> Event | None:
+        """
+        Returns:
+            The record of the event on the line, or None if there isn't one.
+        """
+        if match := cls.find_match(line):
+            return make_event(match[0], match[1].groups(), match[2])
+        return None
+
+    @staticmethod
+    def get_tag_bytes(
+        buf: bytes | bytearray | mmap.mmap, start: int, end: int
+    ) -> bytes:
+        """
+        Extracts the event tag from the undecoded line buf[start:end].
+
+        See get_tag().
+        """
+        pos = start + PREFIX_LEN
+        if buf[pos : pos + 9] == b"[Notice] ":
+            pos += 9
+        first = buf[pos : pos + 1]
+        if first == b"<":
+            close = buf.find(b">", pos, end) + 1
+        elif first == b"[":
+            close = buf.find(b"]", pos, end) + 1
+        else:
+            close = buf.find(b" ", pos, end)
+        return buf[pos:close] if close > pos else b""
+
+    @classmethod
+    def match_bytes(
+        cls, buf: bytes | bytearray | mmap.mmap, start: int = 0, end: int | None = None
+    ) -> tuple[str, tuple[str, ...], datetime] | None:
+        """
+        Matches the undecoded line buf[start:end] without copying it.
+
+        Only the timestamp and the captured fields of a matching line are decoded.
+
+        Returns:
+            A tuple (event_type, fields, timestamp) where:
+            - event_type: the key of the pattern that matched
+            - fields: the decoded capture groups of the pattern
+            - timestamp: the timestamp of the line
+        """
+        if end is None:
+            end = len(buf)
+        if (
+            event_type := cls.TAGS_BYTES.get(cls.get_tag_bytes(buf, start, end))
+        ) is None:
+            return None
+        return cls._match_event_bytes(event_type, buf, start, end)
+
     @classmethod
-    def find_match(cls, line: str) -> tuple[str, re.Match] | None:
-        for event_type, regex in cls.PATTERNS.items():
-            if match := regex.match(line):
-                return (event_type, match)
+    def _match_event_bytes(
+        cls, event_type: str, buf: bytes | bytearray | mmap.mmap, start: int, end: int
+    ) -> tuple[str, tuple[str, ...], datetime] | None:
+        prefix = buf[start : start + PREFIX_LEN].decode(LOG_ENCODING)
+        if (timestamp := cls.parse_timestamp(prefix)) is not None and (
+            match := cls.PATTERNS_BYTES[event_type].match(buf, start + PREFIX_LEN, end)
+        ):
+            cls.hits[event_type] += 1
+            fields = tuple(group.decode(LOG_ENCODING) for group in match.groups())
+            return (event_type, fields, timestamp)
+        cls.misses[event_type] += 1
         return None
+
+    @classmethod
+    def iter_bytes(
+        cls, buf: bytes | bytearray | mmap.mmap, start: int = 0, end: int | None = None
+    ) -> Generator[tuple[str, tuple[str, ...], datetime], None, int]:
+        """
+        Parses every complete line in buf[start:end].
+
+        A trailing line without LOG_NEWLINE is not parsed; its offset is the
+        return value of the generator, so the caller can prepend it to the
+        next chunk.
+
+        Yields:
+            The same tuples as match_bytes().
+        """
+        if end is None:
+            end = len(buf)
+        # Only complete lines are parsed
+        consumed = buf.rfind(LOG_NEWLINE_BYTES, start, end) + 2
+        if consumed < start + 2:
+            return start
+
+        # The first line has no newline in front of it for FIND_TAGS_BYTES
+        eol = buf.find(LOG_NEWLINE_BYTES, start, consumed)
+        if event := cls.match_bytes(buf, start, eol):
+            yield event
+
+        find = buf.find
+        tags = cls.TAGS_BYTES
+        match_event = cls._match_event_bytes
+        for candidate in cls.FIND_TAGS_BYTES.finditer(buf, eol, consumed):
+            start = candidate.start() + 2
+            eol = find(LOG_NEWLINE_BYTES, candidate.end(), consumed)
+            if event := match_event(tags[candidate[1]], buf, start, eol):
+                yield event
+        return consumed
+
+    @classmethod
+    def iter_buffer(
+        cls, buf: bytes | bytearray | mmap.mmap, start: int = 0, end: int | None = None
+    ) -> Generator[tuple[str, tuple[str, ...], datetime], None, None]:
+        """
+        Parses every line in buf[start:end], which holds whole lines.
+
+        Unlike iter_bytes(), the last line doesn't need to end with LOG_NEWLINE.
+
+        Yields:
+            The same tuples as match_bytes().
+        """
+        if end is None:
+            end = len(buf)
+        consumed = yield from cls.iter_bytes(buf, start, end)
+        if consumed < end and (event := cls.match_bytes(buf, consumed, end)):
+            yield event
+
+    @classmethod
+    def parse_lines(
+        cls, lines: Iterable[str] | bytes | bytearray | mmap.mmap
+    ) -> "ParsedLines":
+        """
+        Parses many lines at once into columns.
+
+        Args:
+            lines: Either an iterable of lines, such as an open log file, or a
+                buffer containing the undecoded lines.
+
+        Returns:
+            The events, in the order they were found.
+        """
+        if isinstance(lines, (bytes, bytearray, mmap.mmap)):
+            events = cls.iter_buffer(lines)
+        else:
+            events = (
+                (match[0], match[1].groups(), match[2])
+                for match in map(cls.find_match, lines)
+                if match
+            )
+        result = ParsedLines()
+        append = result.append
+        for event_type, fields, timestamp in events:
+            append(event_type, fields, timestamp)
+        return result
+
+
+class ParsedLines:
+    """
+    Events returned by SCLogParser.parse_lines(), stored column by column.
+
+    Indexing returns the same (event_type, fields, timestamp) tuples as
+    SCLogParser.match_bytes().
+
+    Attributes:
+        types: The code of each event type, an index into SCLogParser.EVENT_TYPES.
+        timestamps: The timestamp of each event, in milliseconds since the epoch.
+        offsets: Where the fields of each event start in `fields`. There is one
+            extra entry at the end, so event i has fields[offsets[i]:offsets[i + 1]].
+        fields: Every field of every event, as an ID in `entities`.
+        entities: Each distinct field value, stored once.
+    """
+
+    __slots__ = ("types", "timestamps", "offsets", "fields", "entities")
+
+    def __init__(self) -> None:
+        self.types = array("B")
+        self.timestamps = array("q")
+        self.offsets = array("I", [0])
+        self.fields = array("I")
+        self.entities = EntityTable()
+
+    @property
+    def strings(self) -> list[str]:
+        """Each distinct field value, indexed by the IDs in `fields`."""
+        return self.entities.names
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> tuple[str, tuple[str, ...], datetime]:
+        code = self.types[index]
+        if index < 0:
+            index += len(self.types)
+        strings = self.entities.names
+        return (
+            SCLogParser.EVENT_TYPES[code],
+            tuple(
+                strings[i]
+                for i in self.fields[self.offsets[index] : self.offsets[index + 1]]
+            ),
+            EPOCH + self.timestamps[index] * MILLISECOND,
+        )
+
+    def append(
+        self, event_type: str, fields: tuple[str, ...], timestamp: datetime
+    ) -> None:
+        intern = self.entities.intern
+        self.fields.extend([intern(field) for field in fields])
+        self.offsets.append(len(self.fields))
+        self.types.append(SCLogParser.EVENT_CODES[event_type])
+        self.timestamps.append((timestamp - EPOCH) // MILLISECOND)
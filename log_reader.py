@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+This module provides functions for reading whole game logs, as opposed to
+following one that is still being written.
+
+Files compressed with gzip, bzip2 or xz, such as archived logbackups, are
+recognized by their first bytes and decompressed as they are read.
+
+Functions:
+    iter_mmap: Parses a file through a read-only memory map.
+    get_opener: Returns how to open a file if it's compressed.
+    iter_stream: Parses a file object as it is read, in bounded memory.
+    iter_file: Parses a file, compressed or not.
+    scan: Parses and handles the events of a file in this process.
+    split_ranges: Splits a file into byte ranges on line boundaries.
+    get_stats: Returns the parser and name cache counters of this process.
+    stats_since: Returns how much those counters went up since a copy.
+    add_stats: Adds counters from another process to those of this one.
+    parse_range: Parses and handles the events in one byte range of a file.
+    scan_parallel: Parses a file in a pool of processes.
+    tail: Finds the last events in a file by reading it backwards.
+"""
+
+import bz2
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import gzip
+import heapq
+from itertools import repeat
+import lzma
+import mmap
+from operator import itemgetter
+import os
+from collections.abc import Callable, Generator, Iterator
+from typing import BinaryIO, TypeVar
+
+from log_parser import LOG_NEWLINE_BYTES, SCLogParser
+from name_cache import CACHES
+
+T = TypeVar("T")
+
+# A handler receives (event_type, fields, timestamp) and returns None to drop the event
+EventHandler = Callable[[str, tuple[str, ...], datetime], T | None]
+
+# SCLogParser.hits and misses, and the (hits, misses, evictions) of each
+# NameCache by name
+Stats = tuple[Counter[str], Counter[str], dict[str, tuple[int, int, int]]]
+
+# Upper bound on the bytes a worker handles at once
+RANGE_SIZE = 32 * 1024 * 1024
+
+# How much tail() reads at a time, going backwards
+TAIL_BLOCK_SIZE = 256 * 1024
+
+# How much iter_stream() decompresses at a time
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+# The magic bytes each compression format starts with, and how to open it
+COMPRESSED_FORMATS: dict[bytes, Callable[..., BinaryIO]] = {
+    b"\x1f\x8b": gzip.open,
+    b"BZh": bz2.open,
+    b"\xfd7zXZ\x00": lzma.open,
+}
+
+
+def iter_mmap(
+    filepath: str, start: int = 0, end: int | None = None
+) -> Generator[tuple[str, tuple[str, ...], datetime], None, None]:
+    """
+    Parses the lines in a file, or in a byte range of it, through a memory map.
+
+    The file is never read into Python objects; only the fields of matching
+    lines are copied out, so memory use doesn't grow with the size of the file.
+
+    Args:
+        filepath: The file to read. It shouldn't be written to while it's read.
+        start: The offset of the first line to parse.
+        end: The offset just past the last line to parse. Defaults to the end
+            of the file.
+
+    Yields:
+        (event_type, fields, timestamp) tuples, as SCLogParser.match_bytes().
+    """
+    with open(filepath, "rb") as f:
+        # Empty files can't be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if hasattr(buf, "madvise"):  # Not on Windows
+                buf.madvise(mmap.MADV_SEQUENTIAL)
+            yield from SCLogParser.iter_buffer(buf, start, end)
+
+
+def get_opener(filepath: str) -> Callable[..., BinaryIO] | None:
+    """
+    Returns:
+        The function to open the file with if it's compressed, such as
+        gzip.open, or None if it isn't.
+    """
+    with open(filepath, "rb") as f:
+        head = f.read(max(map(len, COMPRESSED_FORMATS)))
+    for magic, opener in COMPRESSED_FORMATS.items():
+        if head.startswith(magic):
+            return opener
+    return None
+
+
+def iter_stream(
+    f: BinaryIO, block_size: int = STREAM_BLOCK_SIZE
+) -> Generator[tuple[str, tuple[str, ...], datetime], None, None]:
+    """
+    Parses the lines read from a file object, such as a decompressing one.
+
+    Only one block and the start of the line that continues in the next one
+    are held in memory at a time.
+
+    Args:
+        f: The file object, in binary mode.
+        block_size: How many bytes to read at a time.
+
+    Yields:
+        (event_type, fields, timestamp) tuples, as SCLogParser.match_bytes().
+    """
+    carry = b""
+    while block := f.read(block_size):
+        buf = carry + block if carry else block
+        consumed = yield from SCLogParser.iter_bytes(buf)
+        carry = buf[consumed:]
+    yield from SCLogParser.iter_buffer(carry)
+
+
+def iter_file(
+    filepath: str,
+) -> Generator[tuple[str, tuple[str, ...], datetime], None, None]:
+    """
+    Parses every line in a file, decompressing it if needed.
+
+    Yields:
+        (event_type, fields, timestamp) tuples, as SCLogParser.match_bytes().
+    """
+    if opener := get_opener(filepath):
+        with opener(filepath, "rb") as f:
+            yield from iter_stream(f)
+    else:
+        yield from iter_mmap(filepath)
+
+
+def scan(filepath: str, handler: EventHandler[T]) -> Iterator[tuple[datetime, str, T]]:
+    """
+    Parses a whole file in this process, as it is read.
+
+    Args:
+        filepath: The file to read, which may be compressed.
+        handler: Called with each event; its return value is kept unless it
+            is None.
+
+    Returns:
+        (timestamp, event_type, result) tuples in file order.
+    """
+    return (
+        (timestamp, event_type, result)
+        for event_type, fields, timestamp in iter_file(filepath)
+        if (result := handler(event_type, fields, timestamp)) is not None
+    )
+
+
+def split_ranges(filepath: str, count: int) -> list[tuple[int, int]]:
+    """
+    Splits a file into byte ranges that start and end on line boundaries.
+
+    Args:
+        filepath: The file to split.
+        count: The number of ranges to aim for.
+
+    Returns:
+        A list of (start, end) offsets covering the whole file. There may be
+        fewer than `count` ranges if the file has few lines.
+    """
+    size = os.path.getsize(filepath)
+    bounds = [0]
+    with open(filepath, "rb") as f:
+        for i in range(1, count):
+            pos = max(size * i // count, bounds[-1])
+            f.seek(pos)
+            while block := f.read(1 << 16):
+                if (eol := block.find(LOG_NEWLINE_BYTES)) != -1:
+                    pos += eol + len(LOG_NEWLINE_BYTES)
+                    break
+                # Keep the last byte in case the newline is split across blocks
+                pos += len(block) - 1
+                f.seek(pos)
+            else:
+                pos = size
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def get_stats() -> Stats:
+    """
+    Returns:
+        A copy of the counters SCLogParser and the name caches keep in this
+        process.
+    """
+    return (
+        Counter(SCLogParser.hits),
+        Counter(SCLogParser.misses),
+        {
+            name: (cache.hits, cache.misses, cache.evictions)
+            for name, cache in CACHES.items()
+        },
+    )
+
+
+def stats_since(before: Stats) -> Stats:
+    """
+    Returns:
+        How much the counters of get_stats() went up since `before`.
+    """
+    hits, misses, caches = get_stats()
+    counts = {}
+    for name, (cache_hits, cache_misses, evictions) in caches.items():
+        then = before[2].get(name, (0, 0, 0))
+        counts[name] = (
+            cache_hits - then[0],
+            cache_misses - then[1],
+            evictions - then[2],
+        )
+    return (hits - before[0], misses - before[1], counts)
+
+
+def add_stats(stats: Stats) -> None:
+    """Adds counters from another process, such as a worker's, to this one's."""
+    hits, misses, caches = stats
+    SCLogParser.hits.update(hits)
+    SCLogParser.misses.update(misses)
+    for name, (cache_hits, cache_misses, evictions) in caches.items():
+        if cache := CACHES.get(name):
+            cache.hits += cache_hits
+            cache.misses += cache_misses
+            cache.evictions += evictions
+
+
+def parse_range(
+    filepath: str, start: int, end: int, handler: EventHandler[T]
+) -> tuple[list[tuple[datetime, str, T]], Stats]:
+    """
+    Parses the lines in one byte range of a file.
+
+    Args:
+        filepath: The file to read.
+        start: The offset of the first line in the range.
+        end: The offset just past the last line in the range.
+        handler: Called with each event; its return value is kept unless it
+            is None.
+
+    Returns:
+        A tuple (results, stats) where:
+        - results: (timestamp, event_type, result) tuples in file order
+        - stats: how much the counters of get_stats() went up meanwhile, to
+          be added to those of the process that wants the results
+    """
+    before = get_stats()
+    results = [
+        (timestamp, event_type, result)
+        for event_type, fields, timestamp in iter_mmap(filepath, start, end)
+        if (result := handler(event_type, fields, timestamp)) is not None
+    ]
+    return (results, stats_since(before))
+
+
+def scan_parallel(
+    filepath: str, handler: EventHandler[T], workers: int | None = None
+) -> Iterator[tuple[datetime, str, T]]:
+    """
+    Parses a whole file, spreading the work across several processes.
+
+    The file is split into ranges of at most RANGE_SIZE bytes, which are parsed
+    and handled in a process pool. The handler must be picklable, which means a
+    module-level function. All results are collected before the first one is
+    returned; see scan() for a streaming alternative.
+
+    Args:
+        filepath: The file to read.
+        handler: Called with each event; see parse_range().
+        workers: The number of processes. Defaults to the number of CPUs; with
+            1, or if the file is compressed, this is the same as scan().
+
+    Returns:
+        The (timestamp, event_type, result) tuples of all ranges, merged in
+        timestamp order. The counters the workers kept while parsing are
+        added to those of this process, see add_stats().
+    """
+    workers = workers or os.cpu_count() or 1
+    # A compressed file can only be read from the start
+    if workers == 1 or get_opener(filepath):
+        return scan(filepath, handler)
+    size = os.path.getsize(filepath)
+    ranges = split_ranges(filepath, max(workers, -(-size // RANGE_SIZE)))
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+    with ProcessPoolExecutor(workers) as pool:
+        ranges_parsed = list(
+            pool.map(parse_range, repeat(filepath), starts, ends, repeat(handler))
+        )
+    for _, stats in ranges_parsed:
+        add_stats(stats)
+    return heapq.merge(*(results for results, _ in ranges_parsed), key=itemgetter(0))
+
+
+def tail(
+    filepath: str,
+    count: int,
+    handler: EventHandler[T],
+    block_size: int = TAIL_BLOCK_SIZE,
+) -> tuple[list[tuple[datetime, str, T]], int]:
+    """
+    Finds the last events in a file, reading it backwards in blocks until
+    enough have been found, so the time taken doesn't depend on its size.
+
+    A last line without LOG_NEWLINE is taken to be still being written, and is
+    left out.
+
+    Args:
+        filepath: The file to read.
+        count: How many events to return. With 0, only the end is found.
+        handler: Called with each event; only events it returns something
+            other than None for are counted.
+        block_size: How many bytes to read at a time.
+
+    Returns:
+        The last `count` (timestamp, event_type, result) tuples in file order,
+        and the offset just past the last whole line, where following the
+        file should start.
+    """
+    newline = len(LOG_NEWLINE_BYTES)
+    blocks = []
+    found = 0
+    end = None
+    # The start of a line that continues in the block after this one
+    carry = b""
+    with open(filepath, "rb") as f:
+        pos = os.fstat(f.fileno()).st_size
+        while pos > 0 and (end is None or found < count):
+            start = max(pos - block_size, 0)
+            f.seek(start)
+            data = f.read(pos - start) + carry
+            pos = start
+            if end is None:
+                if (last := data.rfind(LOG_NEWLINE_BYTES)) == -1:
+                    carry = data
+                    continue
+                end = start + last + newline
+                data = data[: last + newline]
+            if start > 0:
+                if (first := data.find(LOG_NEWLINE_BYTES)) == -1:
+                    carry = data
+                    continue
+                carry, data = data[: first + newline], data[first + newline :]
+            events = [
+                (timestamp, event_type, result)
+                for event_type, fields, timestamp in SCLogParser.iter_buffer(data)
+                if (result := handler(event_type, fields, timestamp)) is not None
+            ]
+            blocks.append(events)
+            found += len(events)
+    events = [event for block in reversed(blocks) for event in block]
+    return events[max(len(events) - count, 0) :], end or 0
+
+
+# vim: set expandtab ts=4 sw=4
@@ -1,17 +1,49 @@
 #!/usr/bin/env python3
 from argparse import ArgumentParser
-from datetime import timedelta
-from io import TextIOWrapper
+import asyncio
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from functools import cache
+import json
+from multiprocessing import freeze_support
 import os
 import re
+import sys
 import time
-from collections.abc import Generator
-from typing import Any, NoReturn
+from collections.abc import Callable, Generator, Iterable
+from typing import Any, TypeVar
 
+import checkpoint
 from colorize import Color
-from data import LOCATIONS, SHIPS, WEAPONS_FPS, WEAPONS_SHIP
-from log_parser import SCLogParser
+import data
+from entity_table import EntityTable
+from events import (
+    ActorDeath,
+    Connected,
+    Connecting,
+    ContextEstablisherTask,
+    Event,
+    Incap,
+    Jump,
+    Loaded,
+    Loading,
+    QuantumTravel,
+    Quit,
+    QuitLobby,
+    Respawn,
+    Spawn,
+    VehicleDestruction,
+    field_names,
+    make_event,
+)
+from log_follower import Follower
+from log_parser import LOG_ENCODING, LOG_NEWLINE, SCLogParser
+from log_reader import scan_parallel, tail as find_tail
+from name_cache import CACHES, cache_name
+from prefix_index import PrefixIndex
+from terminal_writer import TerminalWriter
 
+T = TypeVar("T")
 
 LOADED_ITEM = {
     "pu": "PU",
@@ -20,14 +52,13 @@ LOADED_ITEM = {
 }
 
 
-LOG_INCAP_CAUSE = re.compile(r"([\w\d]+) \((\d.\d+) damage\)(?:, )?")
-
+# The formats get_vehicle() parses, for reference; it doesn't use them, as
+# they backtrack on long names that don't match
 RE_VEHICLE_NAME = re.compile(
     r"(.*?)_?((?:EA|PU)_AI_(?:CFP|CIV|CRIM(?:_QIG|_ScatterGun)?|NineTails|NT(?:_NonLethal)?|PIR(?:_Elite)?|UEE|VAN_Alpha|Xenothreat))?_(\d{12,})"
 )
 RE_SHIP_DEBRIS = re.compile(r"SCItem_Debris_\d{12,}_(.*?)(?:_(?:PU|EA)_.*)?_\d{12,}")
 
-RE_HAZARD = re.compile(r"(Radiation|Water)_Hazard")
 RE_HAZARD_NUM = re.compile(r"Hazard-\d{3}")
 # Seen: 000, 002, 003, 004
 # there's also a "Hazard_Area18" at Area 18
@@ -47,15 +78,6 @@ LOAD = Color.WHITE("LOAD".rjust(10), bold=True)
 QUANTUM = Color.BLACK("QUANTUM".rjust(10), bold=True)
 
 
-def follow(f: TextIOWrapper) -> Generator[str, Any, NoReturn]:
-    while True:
-        if line := f.readline():
-            yield line
-        else:
-            time.sleep(1)
-            continue
-
-
 PATTERN_ID = re.compile(r"([\w-]+)_\d{12,}")
 
 
@@ -65,10 +87,11 @@ def remove_id(name: str) -> str:
     return name
 
 
+@cache_name
 def clean_location(name: str) -> tuple[str, str, str]:
     try:
         # todo not all are "at"
-        return ("at", LOCATIONS[name.replace("@", "")], "loc")
+        return ("at", data.LOCATIONS[name.replace("@", "")], "loc")
     except KeyError:
         pass
 
@@ -99,56 +122,111 @@ def clean_location(name: str) -> tuple[str, str, str]:
     return ("at", name, "loc")
 
 
+# How clean_name() recognizes NPCs and other non-player entities, in order of
+# precedence: (kind, pattern, result). The kind is "exact", "prefix",
+# "contains" or "regex"; the result is either the name to show, or a function
+# that returns it from the entity name.
+CLEAN_NAME_RULES: list[tuple[str, str, str | Callable[[str], str]]] = [
+    ("exact", "unknown", "unknown"),
+    ("prefix", "PU_Human_Enemy_", lambda name: "_".join(name.split("_")[5:7])),
+    ("prefix", "PU_Human-", lambda name: "_".join(re.split(r"[_-]+", name)[2:6])),
+    (
+        "prefix",
+        "NPC_Archetypes-Human-",
+        lambda name: "_".join(re.split(r"[_-]+", name)[3:7]),
+    ),
+    (
+        "prefix",
+        "NPC_Archetypes-",
+        lambda name: name[: name.rindex("_")].split("-")[-1].replace("-", "_"),
+    ),
+    ("prefix", "Kopion_", "Kopion"),
+    (
+        "prefix",
+        "PU_Pilots-",
+        lambda name: "_".join(["Pilot", *re.split(r"[_-]+", name)[3:6]]),
+    ),
+    ("prefix", "AIModule_Unmanned_PU_SecurityNetwork_", "NPC Security"),
+    ("prefix", "AIModule_Unmanned_PU_Advocacy_", "NPC UEE Security"),
+    # Some cases from Pyro observed:
+    ("contains", "Pilot_Criminal_Pilot", "NPC Pilot"),
+    ("contains", "Pilot_Criminal_Gunner", "NPC Gunner"),
+    ("contains", "pyro_outlaw", "NPC Criminal"),
+    ("prefix", "Radiation_Hazard", "Radiation Hazard"),
+    ("prefix", "Water_Hazard", "Water Hazard"),
+    ("regex", RE_HAZARD_NUM.pattern, "Environmental Hazard"),
+    ("exact", "Nova-01", "Nova"),
+    ("prefix", "Quasigrazer_", "Quasigrazer"),
+    # fun fact, kill messages aren't logged for maroks
+    ("regex", RE_ASTEROID.pattern, "Asteroid"),
+]
+
+
+def compile_rules(
+    rules: list[tuple[str, str, str | Callable[[str], str]]],
+) -> Callable[[str], int | None]:
+    """
+    Compiles name rules so that a name is classified in one pass, instead of
+    one check per rule.
+
+    The exact, prefix and regex rules become the groups of a single regex,
+    matched at the start of the name; alternatives are tried in order, so the
+    group that matched is the first of those rules that applies, and fails at
+    the first character for most of them. Contains rules are substring
+    searches, and only the ones before the rule the regex found are tried.
+    Regex rules mustn't have capturing groups.
+
+    Returns:
+        A function that returns the index of the first rule that applies to
+        a name, or None if none does.
+    """
+    kinds = {
+        "exact": lambda pattern: re.escape(pattern) + r"\Z",
+        "prefix": re.escape,
+        "regex": lambda pattern: pattern,
+    }
+    contains = [
+        (i, pattern) for i, (kind, pattern, _) in enumerate(rules) if kind == "contains"
+    ]
+    anchored = [
+        (i, kind, pattern)
+        for i, (kind, pattern, _) in enumerate(rules)
+        if kind != "contains"
+    ]
+    regex = re.compile(
+        "|".join(f"({kinds[kind](pattern)})" for _, kind, pattern in anchored)
+    )
+    if regex.groups != len(anchored):
+        raise ValueError("Name rules mustn't have capturing groups")
+    indexes = [i for i, _, _ in anchored]
+
+    def classify(name: str) -> int | None:
+        rule = indexes[match.lastindex - 1] if (match := regex.match(name)) else None
+        for i, pattern in contains:
+            if rule is not None and i > rule:
+                break
+            if pattern in name:
+                return i
+        return rule
+
+    return classify
+
+
+classify_name = compile_rules(CLEAN_NAME_RULES)
+
+
+@cache_name
 def clean_name(name: str) -> tuple[str, int]:
     """
     Returns:
         A tuple (name, npc), where:
         - name: name of the entity
-        - npc: whether the entity is an npc (if name matched a pattern below)
+        - npc: whether the entity is an npc (if name matched a rule in
+          CLEAN_NAME_RULES, or is a vehicle or weapon)
     """
-    if name == "unknown":
-        return (name, 1)
-    if name.startswith("PU_Human_Enemy_"):
-        name_split = name.split("_")
-        return ("_".join(name_split[5:7]), 1)
-    if name.startswith("PU_Human-"):
-        name_split = re.split(r"[_-]+", name)
-        return ("_".join(name_split[2:6]), 1)
-    if name.startswith("NPC_Archetypes-Human-"):
-        name_split = re.split(r"[_-]+", name)
-        return ("_".join(name_split[3:7]), 1)
-    if name.startswith("NPC_Archetypes-"):
-        return (name[: name.rindex("_")].split("-")[-1].replace("-", "_"), 1)
-    if name.startswith("Kopion_"):
-        return ("Kopion", 1)
-    if name.startswith("PU_Pilots-"):
-        name_split = re.split(r"[_-]+", name)
-        return ("_".join(["Pilot", *name_split[3:6]]), 1)
-    if name.startswith("AIModule_Unmanned_PU_SecurityNetwork_"):
-        return ("NPC Security", 1)
-    if name.startswith("AIModule_Unmanned_PU_Advocacy_"):
-        return ("NPC UEE Security", 1)
-    # Some cases from Pyro observed:
-    if "Pilot_Criminal_Pilot" in name:
-        return ("NPC Pilot", 1)
-    if "Pilot_Criminal_Gunner" in name:
-        return ("NPC Gunner", 1)
-    if "pyro_outlaw" in name:
-        return ("NPC Criminal", 1)
-
-    if hazard := RE_HAZARD.match(name):
-        return (f"{hazard[1]} Hazard", 1)
-    if RE_HAZARD_NUM.match(name):
-        return ("Environmental Hazard", 1)
-
-    if name == "Nova-01":
-        return ("Nova", 1)
-    if name.startswith("Quasigrazer_"):
-        return ("Quasigrazer", 1)
-    # fun fact, kill messages aren't logged for maroks
-
-    if RE_ASTEROID.match(name):
-        return ("Asteroid", 1)
+    if (rule := classify_name(name)) is not None:
+        result = CLEAN_NAME_RULES[rule][2]
+        return (result if isinstance(result, str) else result(name), 1)
 
     # or vehicles
     vehicle_name, found = get_vehicle(name)
@@ -158,11 +236,9 @@ def clean_name(name: str) -> tuple[str, int]:
     # killer can be weapons too
     # KILL: behr_gren_frag_01_123456789012 killed Contestedzones_sniper with a unknown at
     # KILL: behr_pistol_ballistic_01_123456789012 killed Headhunters_techie NPC with a unknown in an Unknown Surface Facility
-    try:
-        if (fps_name := remove_id(name)) != name:
-            return (WEAPONS_FPS[fps_name], 1)
-    except KeyError:
-        pass
+    if (weapon_name := remove_id(name)) != name:
+        if (weapon := get_weapon(weapon_name)) is not None:
+            return (weapon, 1)
 
     return (name, 0)
 
@@ -181,19 +257,37 @@ def clean_tool(name: str, killer: str, killed: str, damage_type: str) -> str:
 
         return damage_type
 
-    try:
-        return WEAPONS_FPS[name]
-    except KeyError:
-        pass
-
-    try:
-        return WEAPONS_SHIP[name]
-    except KeyError:
-        pass
+    if (weapon := get_weapon(name)) is not None:
+        return weapon
 
     return name
 
 
+@cache
+def get_weapons() -> PrefixIndex[str]:
+    """
+    Returns:
+        The FPS and ship weapons by class name, indexed the first time
+        they're needed.
+    """
+    return PrefixIndex({**data.WEAPONS_SHIP, **data.WEAPONS_FPS})
+
+
+def get_weapon(name: str) -> str | None:
+    """
+    Classes that aren't known, such as skins added since the data was
+    extracted, are named after the weapon they're a variant of.
+
+    Returns:
+        The name of the weapon, with "(Variant)" after it if the class is an
+        unknown variant of a known weapon, or None if it isn't a weapon.
+    """
+    if (found := get_weapons().longest_prefix(name)) is None:
+        return None
+    weapon_class, weapon = found
+    return weapon if weapon_class == name else f"{weapon} (Variant)"
+
+
 VEHICLE_TYPES = {
     "PU_AI_CFP": "CFP",
     "PU_AI_CIV": "Civilian",
@@ -213,10 +307,91 @@ VEHICLE_TYPES = {
 }
 
 
+# The AI suffixes RE_VEHICLE_NAME recognizes between a ship and its ID, indexed
+# by their last "_"-separated part
+AI_FACTIONS = [
+    "CFP",
+    "CIV",
+    "CRIM",
+    "CRIM_QIG",
+    "CRIM_ScatterGun",
+    "NineTails",
+    "NT",
+    "NT_NonLethal",
+    "PIR",
+    "PIR_Elite",
+    "UEE",
+    "VAN_Alpha",
+    "Xenothreat",
+]
+AI_SUFFIXES: dict[str, list[str]] = {}
+for suffix in (
+    f"{game}_AI_{faction}" for game in ("EA", "PU") for faction in AI_FACTIONS
+):
+    AI_SUFFIXES.setdefault(suffix.rpartition("_")[2], []).append(suffix)
+
+RE_ENTITY_ID = re.compile(r"_\d{12}")
+RE_DEBRIS_START = re.compile(r"SCItem_Debris_\d{12,}_")
+RE_DEBRIS_SUFFIX = re.compile(r"_(?:PU|EA)_")
+
+
 def get_vehicle_type(name: str) -> str:
     return VEHICLE_TYPES.get(name, name)
 
 
+def split_vehicle_name(name: str) -> tuple[str, str | None] | None:
+    """
+    Splits a vehicle's entity name into the name of the ship and its AI
+    suffix, the same as RE_VEHICLE_NAME but in linear time, without
+    backtracking.
+
+    The ship name ends just before the first entity ID, less the AI suffix
+    and the "_" in front of it if there are any.
+
+    Returns:
+        A tuple (ship, suffix), where suffix is None if there's no AI suffix,
+        or None if there's no entity ID in the name.
+    """
+    if not (entity_id := RE_ENTITY_ID.search(name)):
+        return None
+    end = entity_id.start()
+    for suffix in AI_SUFFIXES.get(name[:end].rpartition("_")[2], ()):
+        if name.endswith(suffix, 0, end):
+            start = end - len(suffix)
+            if start > 0 and name[start - 1] == "_":
+                start -= 1
+            return (name[:start], suffix)
+    if end > 0 and name[end - 1] == "_":
+        end -= 1
+    return (name[:end], None)
+
+
+def get_debris_ship(name: str) -> str | None:
+    """
+    Finds the ship name in a debris entity name, the same as RE_SHIP_DEBRIS
+    but in linear time, without backtracking.
+
+    The ship name starts after the first entity ID. It ends at the next
+    entity ID, or at a "_PU_" or "_EA_" suffix if that comes first and is
+    followed by an entity ID somewhere.
+
+    Returns:
+        The ship name, or None if it isn't a debris name.
+    """
+    if not (debris := RE_DEBRIS_START.match(name)):
+        return None
+    start = debris.end()
+    ends = []
+    if entity_id := RE_ENTITY_ID.search(name, start):
+        ends.append(entity_id.start())
+        if suffix := RE_DEBRIS_SUFFIX.search(name, start):
+            *_, last_id = RE_ENTITY_ID.finditer(name, entity_id.start())
+            if last_id.start() >= suffix.end():
+                ends.append(suffix.start())
+    return name[start : min(ends)] if ends else None
+
+
+@cache_name
 def get_vehicle(name: str) -> tuple[str, bool]:
     """
     Returns:
@@ -224,191 +399,521 @@ def get_vehicle(name: str) -> tuple[str, bool]:
         - name: the name of the ship if found
         - found: whether the vehicle was found
     """
-    match = RE_VEHICLE_NAME.match(name)
-    if not match:
+    parts = split_vehicle_name(name)
+    if not parts:
         # Is it a moving asteroid?...
         asteroid = RE_ASTEROID.match(name)
         if asteroid:
             return ("Asteroid", True)
         return (name, False)
-    vehicle_name = match[1]
-    vehicle_type = get_vehicle_type(match[2]) + " " if match[2] else ""
+    vehicle_name, suffix = parts
+    vehicle_type = get_vehicle_type(suffix) + " " if suffix else ""
 
     try:
-        return (vehicle_type + SHIPS[vehicle_name], True)
+        return (vehicle_type + data.SHIPS[vehicle_name], True)
     except KeyError:
         pass
 
     # Is it debris?
-    debris = RE_SHIP_DEBRIS.match(name)
-    if debris:
+    if (debris := get_debris_ship(name)) is not None:
         try:
-            return (SHIPS[debris[1]] + " (Debris)", True)
+            return (data.SHIPS[debris] + " (Debris)", True)
         except KeyError:
             pass
 
     return (name, False)
 
 
-LOG_ENCODING = "latin-1"
-LOG_NEWLINE = "\r\n"
+# Names a Renderer keeps, with their cleaned up versions, before starting over
+MAX_ENTITIES = 65536
 
 
-def main(filepath: str) -> None:
-    is_prev_line_cet = False
+class Renderer:
+    """
+    Renders event records as lines of text.
+
+    Each event is rendered by the method named after its event type in lower
+    case, e.g. killp() for ActorDeath events; events without one aren't
+    displayed. Subclasses render events in other ways.
+
+    Attributes:
+        overwrite_cet: Whether a CET event is printed over the line of the CET
+            event just before it, as on a terminal.
+        entities: The names in the events formatted so far, which each event
+            refers to, and what clean() made of them. Emptied once it has
+            MAX_ENTITIES, as raw names carry per-spawn IDs and it would
+            otherwise grow for as long as a log is followed.
+    """
+
+    overwrite_cet = False
+
+    def __init__(self) -> None:
+        self.entities = EntityTable()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Sent to worker processes without the names; they have their own
+        state = self.__dict__.copy()
+        state["entities"] = EntityTable()
+        return state
+
+    def clean(self, func: Callable[[str], T], name: str) -> T:
+        """
+        Returns:
+            func(name), for a clean_* function, computed once per name.
+        """
+        return self.entities.apply(func, name)
+
+    def render(self, event: Event) -> str | None:
+        """
+        Returns:
+            The line to print, or None if the event isn't displayed.
+        """
+        method = getattr(self, event.event_type.lower(), None)
+        return None if method is None else method(event)
+
+    def format(
+        self, event_type: str, fields: tuple[str, ...], timestamp: datetime
+    ) -> str | None:
+        """Renders an event from what the parser found, as an event handler."""
+        if len(self.entities) >= MAX_ENTITIES:
+            self.entities = EntityTable()
+        return self.render(make_event(event_type, fields, timestamp, self.entities))
+
+
+class TerminalRenderer(Renderer):
+    """Renders events with cleaned up names, colored with ANSI escapes."""
+
+    overwrite_cet = True
+
+    def cet(self, event: ContextEstablisherTask) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        status, preposition = (
+            (Color.GREEN("Complete") if event.step == 15 else "Complete", "in")
+            if event.finished
+            else (Color.YELLOW("Busy".rjust(8)), "for")
+        )
+        running_time = int(event.running_time)
+        running_time_color = (
+            "RED"
+            if running_time > 300
+            else ("YELLOW" if running_time > 150 else "CYAN")
+        )
+        running_time_text = Color[running_time_color](
+            str(timedelta(seconds=running_time))
+        )
+        return f"{when}{LOAD}: {status}: {event.step:>2}/15 {Color.CYAN(event.state)}:{Color.CYAN(event.taskname)} {preposition} {running_time_text}"
+
+    def killp(self, event: ActorDeath) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        killed, is_killed_npc = self.clean(clean_name, event.killed)
+        lp, location, location_type = self.clean(clean_location, event.zone)
+        is_ship = "ship" == location_type
+        killer, is_killer_npc = self.clean(clean_name, event.killer)
+        cause = clean_tool(event.weapon, event.killer, event.killed, event.damage_type)
+        if cause.startswith("suicide"):
+            return f"{when}{KILL}: {Color.GREEN(killer)} committed {Color.CYAN(cause)} {lp} {Color.YELLOW(location)}"
+        elif is_killer_npc and is_killed_npc:
+            if is_ship:
+                return f"{when}{KILL}: {Color.BLACK(killer, bold = True)} killed {Color.BLACK(killed, bold = True)} {lp} {Color.YELLOW(location)} with a {Color.CYAN(cause)}"
+            else:
+                return f"{when}{KILL}: {Color.BLACK(killer, bold = True)} killed {Color.BLACK(killed, bold = True)} with a {Color.CYAN(cause)} {lp} {Color.YELLOW(location)}"
+        else:
+            if is_ship:
+                return f"{when}{KILL}: {Color.GREEN(killer)} killed {Color.GREEN(killed)} {lp} {Color.YELLOW(location)} with a {Color.CYAN(cause)}"
+            else:
+                return f"{when}{KILL}: {Color.GREEN(killer)} killed {Color.GREEN(killed)} with a {Color.CYAN(cause)} {lp} {Color.YELLOW(location)}"
+
+    def killv(self, event: VehicleDestruction) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        # The vehicle and killer are vehicles, or if the event is a collision, npc/player entities
+        vehicle_name, found = self.clean(get_vehicle, event.vehicle)
+        vehicle = Color.GREEN(
+            vehicle_name if found else self.clean(clean_name, event.vehicle)[0]
+        )
+        lp, location, _ = self.clean(clean_location, event.zone)
+        driver, _ = self.clean(clean_name, event.driver)
+        if driver == "unknown":
+            driver = ""
+        else:
+            driver = Color.GREEN(driver) + " in a "
+        kill_type = (
+            Color.YELLOW("disabled")
+            if event.destroy_level == 1
+            else Color.RED("destroyed")
+        )
+
+        vehicle_name2, found2 = self.clean(get_vehicle, event.killer)
+        killer = Color.GREEN(
+            vehicle_name2 if found2 else self.clean(clean_name, event.killer)[0]
+        )
+        dmgtype = Color.CYAN(event.damage_type)
+        return f"{when}{VKILL}: {killer} {kill_type} a {driver}{vehicle} with {dmgtype} {lp} {Color.YELLOW(location)}"
+
+    def respawn(self, event: Respawn) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        whom = Color.GREEN(event.player)
+        _, where, _ = self.clean(clean_location, event.location)
+        return f"{when}{RESPAWN}: {whom} from {Color.YELLOW(where)}"
+
+    def incap(self, event: Incap) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        whom = Color.GREEN(event.player)
+        causes = ", ".join(
+            Color.YELLOW(cause.replace("Damage", "")) for cause, _ in event.causes
+        )
+        return f"{when}{INCAP}: {whom} from {causes}"
+
+    def quitlobby(self, event: QuitLobby) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        whom = Color.GREEN(event.player)
+        return f"{when}{QUIT}: {whom} has quit the game session."
+
+    def spawn(self, event: Spawn) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        return f"{when}{SPAWNED}: Character spawned!"
+
+    def jump(self, event: Jump) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        whom = Color.GREEN(event.player)
+        origin = Color.BLUE(event.origin, bold=True)
+        dest = Color.BLUE(event.destination, bold=True)
+        return f"{when}{JUMP}: {whom} has departed {origin} for the {dest} system."
+
+    def connecting(self, event: Connecting) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        return f"{when}{CONNECT}: Connecting..."
+
+    def connected(self, event: Connected) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        return f"{when}{CONNECT}: Connected!"
+
+    def loading(self, event: Loading) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        return f"{when}{LOAD}: Loading..."
+
+    def loaded(self, event: Loaded) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        what = Color.GREEN(LOADED_ITEM.get(event.item, event.item))
+        running_time_text = Color.GREEN(
+            str(timedelta(seconds=event.load_time)).rstrip("0")
+        )
+        return f"{when}{LOAD}: Loaded! {what} took {running_time_text} to load."
+
+    def quit(self, event: Quit) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        return f"{when}{QUIT}: Game quit."
+
+    def quantum(self, event: QuantumTravel) -> str:
+        when = event.timestamp.isoformat(" ", "seconds")
+        name = Color.GREEN(event.player)
+        dest = Color.YELLOW(self.clean(clean_location, event.destination)[1])
+        return f"{when}{QUANTUM}: {name} started quantum travel to {dest}"
+
+
+RENDERER = TerminalRenderer()
+
+# Compact, and with keys in the order they're added
+JSON_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+class JsonRenderer(Renderer):
+    """
+    Renders every event as a line of JSON, for other programs to read rather
+    than people, without any ANSI escapes.
+
+    Each line is an object with the event type, the timestamp in ISO 8601
+    format, the fields of the event as parsed from the log, and the names in
+    them cleaned up as the terminal shows them. The methods named after event
+    types return the cleaned up names, if any.
+
+    Args:
+        install: If given, added to every object, to tell logs apart.
+    """
+
+    def __init__(self, install: str | None = None) -> None:
+        super().__init__()
+        self.install = install
+
+    def render(self, event: Event) -> str:
+        method = getattr(self, event.event_type.lower(), None)
+        record: dict[str, Any] = {
+            "event": event.event_type,
+            "timestamp": event.timestamp.replace(tzinfo=timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+        }
+        if self.install is not None:
+            record["install"] = self.install
+        record["fields"] = {
+            name: getattr(event, name) for name in field_names(type(event))
+        }
+        record["cleaned"] = {} if method is None else method(event)
+        return JSON_ENCODER.encode(record)
+
+    def killp(self, event: ActorDeath) -> dict[str, Any]:
+        killed, is_killed_npc = self.clean(clean_name, event.killed)
+        _, location, location_type = self.clean(clean_location, event.zone)
+        killer, is_killer_npc = self.clean(clean_name, event.killer)
+        return {
+            "killed": killed,
+            "killed_npc": bool(is_killed_npc),
+            "killer": killer,
+            "killer_npc": bool(is_killer_npc),
+            "weapon": clean_tool(
+                event.weapon, event.killer, event.killed, event.damage_type
+            ),
+            "location": location,
+            "location_type": location_type,
+        }
+
+    def killv(self, event: VehicleDestruction) -> dict[str, Any]:
+        vehicle, found = self.clean(get_vehicle, event.vehicle)
+        killer, killer_found = self.clean(get_vehicle, event.killer)
+        driver, _ = self.clean(clean_name, event.driver)
+        return {
+            "vehicle": vehicle if found else self.clean(clean_name, event.vehicle)[0],
+            "driver": None if driver == "unknown" else driver,
+            "killer": (
+                killer if killer_found else self.clean(clean_name, event.killer)[0]
+            ),
+            "destroyed": event.destroy_level != 1,
+            "location": self.clean(clean_location, event.zone)[1],
+        }
+
+    def respawn(self, event: Respawn) -> dict[str, Any]:
+        return {"location": self.clean(clean_location, event.location)[1]}
+
+    def incap(self, event: Incap) -> dict[str, Any]:
+        return {"causes": [cause.replace("Damage", "") for cause, _ in event.causes]}
+
+    def loaded(self, event: Loaded) -> dict[str, Any]:
+        return {"item": LOADED_ITEM.get(event.item, event.item)}
+
+    def quantum(self, event: QuantumTravel) -> dict[str, Any]:
+        return {"destination": self.clean(clean_location, event.destination)[1]}
+
+
+# How events can be printed, by the name of the format
+RENDERERS: dict[str, Renderer] = {"text": RENDERER, "jsonl": JsonRenderer()}
+
+
+# Where events are printed, in batches
+OUTPUT = TerminalWriter()
+
+
+def print_events(
+    events: Iterable[tuple[str, str]],
+    is_prev_line_cet: bool = False,
+    output: TerminalWriter = OUTPUT,
+    overwrite_cet: bool = True,
+) -> bool:
+    """
+    Prints formatted events.
+
+    Args:
+        events: (event_type, line) pairs, as returned by format_lines().
+        is_prev_line_cet: Whether the last line printed before these was a
+            CET event, which the next one overwrites.
+        output: Where to print them. They may not be written until it's
+            flushed, and a CET event may not be written until it's flushed
+            without hold_update.
+        overwrite_cet: Whether a CET event is printed over the line of the
+            CET event just before it; see Renderer.overwrite_cet.
+
+    Returns:
+        Whether the last line printed was a CET event.
+    """
+    for event_type, text in events:
+        is_cet = event_type == "CET"
+        if is_cet and overwrite_cet:
+            # A burst of them is drawn once, with the latest step
+            output.update(text, over=is_prev_line_cet)
+        else:
+            output.print(text)
+        is_prev_line_cet = is_cet
+    return is_prev_line_cet
+
+
+def format_lines(
+    lines: Iterable[str], renderer: Renderer = RENDERER
+) -> Generator[tuple[str, str], Any, None]:
+    for line in lines:
+        if match := SCLogParser.find_match(line):
+            if text := renderer.format(match[0], match[1].groups(), match[2]):
+                yield (match[0], text)
+
+
+async def follow_log(
+    filepath: str,
+    replay: bool = False,
+    tail: int | None = None,
+    tag: str = "",
+    printed: dict[str, str] | None = None,
+    renderer: Renderer = RENDERER,
+) -> None:
+    """
+    Prints the events in a log as the game writes them, until cancelled.
+
+    Where it got to is checkpointed every CHECKPOINT_INTERVAL seconds and when
+    cancelled, and the next run on the same log carries on from there.
+
+    Args:
+        filepath: The log to follow.
+        replay: Whether to ignore the checkpoint and start from the beginning.
+        tail: If given, ignore the checkpoint, print only the last `tail`
+            events and follow the log from its end.
+        tag: Printed at the start of each line, to tell logs apart.
+        printed: Shared by the logs followed at the same time, to record which
+            one printed the last line; a CET event only overwrites the last
+            line if it was printed for the same log.
+        renderer: How to render the events.
+    """
+    printed = {} if printed is None else printed
     try:
-        f = open(filepath, "r", encoding=LOG_ENCODING, newline=LOG_NEWLINE)
-        for line in follow(f):
-            if match := SCLogParser.find_match(line):
-                log_type = match[0]
-                log = match[1]
-                when = log[1].replace("T", " ")
-                if log_type == "CET":
-                    step_num = log[5]
-                    which = (
-                        (
-                            Color.GREEN("Complete") if step_num == "15" else "Complete",
-                            "in",
-                        )
-                        if log[2] == "ContextEstablisherTaskFinished"
-                        else (Color.YELLOW("Busy".rjust(8)), "for")
-                    )
-                    taskname = log[3]
-                    step = log[4]
-                    running_time = int(float(log[6]))
-                    running_time_color = (
-                        "RED"
-                        if running_time > 300
-                        else ("YELLOW" if running_time > 150 else "CYAN")
-                    )
-                    running_time_text = Color[running_time_color](
-                        str(timedelta(seconds=running_time))
-                    )
-                    if is_prev_line_cet:
-                        # Move cursor up one line and clear it
-                        print("\x1b[1A\x1b[2K", end="")
-                    print(
-                        f"{when}{LOAD}: {which[0]}: {step_num.rjust(2)}/15 {Color.CYAN(step)}:{Color.CYAN(taskname)} {which[1]} {running_time_text}"
-                    )
-                    is_prev_line_cet = True
-                    continue
-
-                if log_type == "KILLP":
-                    killed, is_killed_npc = clean_name(log[2])
-                    lp, location, location_type = clean_location(log[3])
-                    is_ship = "ship" == location_type
-                    killer, is_killer_npc = clean_name(log[4])
-                    cause = clean_tool(log[5], log[4], log[2], log[6])
-                    if cause.startswith("suicide"):
-                        print(
-                            f"{when}{KILL}: {Color.GREEN(killer)} committed {Color.CYAN(cause)} {lp} {Color.YELLOW(location)}"
-                        )
-                    elif is_killer_npc and is_killed_npc:
-                        if is_ship:
-                            print(
-                                f"{when}{KILL}: {Color.BLACK(killer, bold = True)} killed {Color.BLACK(killed, bold = True)} {lp} {Color.YELLOW(location)} with a {Color.CYAN(cause)}"
-                            )
-                        else:
-                            print(
-                                f"{when}{KILL}: {Color.BLACK(killer, bold = True)} killed {Color.BLACK(killed, bold = True)} with a {Color.CYAN(cause)} {lp} {Color.YELLOW(location)}"
-                            )
-                    else:
-                        if is_ship:
-                            print(
-                                f"{when}{KILL}: {Color.GREEN(killer)} killed {Color.GREEN(killed)} {lp} {Color.YELLOW(location)} with a {Color.CYAN(cause)}"
-                            )
-                        else:
-                            print(
-                                f"{when}{KILL}: {Color.GREEN(killer)} killed {Color.GREEN(killed)} with a {Color.CYAN(cause)} {lp} {Color.YELLOW(location)}"
-                            )
-                elif log_type == "KILLV":
-                    # log[2] and log[6] are vehicles, or if the event is a collision, npc/player entities
-                    vehicle_name, found = get_vehicle(log[2])
-                    vehicle = Color.GREEN(
-                        vehicle_name if found else clean_name(log[2])[0]
-                    )
-                    lp, location, _ = clean_location(log[3])
-                    driver, _ = clean_name(log[4])
-                    if driver == "unknown":
-                        driver = ""
-                    else:
-                        driver = Color.GREEN(driver) + " in a "
-                    kill_type = (
-                        Color.YELLOW("disabled")
-                        if log[5] == "1"
-                        else Color.RED("destroyed")
+        f = open(filepath, "rb")
+    except FileNotFoundError:
+        print(Color.RED(f'Log file "{filepath}" not found.'), file=sys.stderr)
+        return
+    with f:
+        is_prev_line_cet = False
+        if tail is not None:
+            events, offset = find_tail(filepath, tail, renderer.format)
+            f.seek(offset)
+            if events:
+                is_prev_line_cet = print_events(
+                    ((event_type, tag + text) for _, event_type, text in events),
+                    overwrite_cet=renderer.overwrite_cet,
+                )
+                printed["tag"] = tag
+        elif not replay and (offset := checkpoint.load(f)) is not None:
+            # Only where it got to; this run starts on a fresh screen, with
+            # no CET line of its own to overwrite yet
+            f.seek(offset)
+        # Printed as soon as the log has been caught up with, except for a CET
+        # event that comes too soon after the last one, until the next time
+        follower = Follower(f, on_idle=lambda: OUTPUT.flush(hold_update=True))
+        lines = follower.__aiter__()
+        next_save = time.monotonic() + checkpoint.CHECKPOINT_INTERVAL
+        try:
+            async for line in lines:
+                if events := [
+                    (event_type, tag + text)
+                    for event_type, text in format_lines((line,), renderer)
+                ]:
+                    is_prev_line_cet = print_events(
+                        events,
+                        is_prev_line_cet and printed.get("tag") == tag,
+                        overwrite_cet=renderer.overwrite_cet,
                     )
+                    printed["tag"] = tag
+                if time.monotonic() >= next_save:
+                    checkpoint.save(follower.file, follower.offset)
+                    next_save = time.monotonic() + checkpoint.CHECKPOINT_INTERVAL
+        finally:
+            OUTPUT.flush()
+            # Before closing the follower, which closes the file it's reading
+            checkpoint.save(follower.file, follower.offset)
+            await lines.aclose()
+
+
+def main(
+    filepaths: list[str],
+    replay: bool = False,
+    tail: int | None = None,
+    output_format: str = "text",
+) -> None:
+    """
+    Prints the events in one or more logs as the game writes them, until
+    interrupted. With more than one log, each line starts with the name of
+    the install it came from, such as LIVE or PTU, or in JSON, has it as
+    "install".
+
+    Args:
+        filepaths: The logs to follow, all at once in one event loop.
+        replay: See follow_log().
+        tail: See follow_log().
+        output_format: The name of the format in RENDERERS to print in.
+    """
+    renderers = [RENDERERS[output_format]] * len(filepaths)
+    tags = [""] * len(filepaths)
+    if len(filepaths) > 1:
+        names = [get_install(filepath) for filepath in filepaths]
+        if output_format == "jsonl":
+            renderers = [JsonRenderer(name) for name in names]
+        else:
+            width = max(map(len, names))
+            tags = [Color.MAGENTA(name.ljust(width)) + " " for name in names]
+
+    async def follow_all() -> None:
+        printed: dict[str, str] = {}
+        await asyncio.gather(
+            *(
+                follow_log(filepath, replay, tail, tag, printed, renderer)
+                for filepath, tag, renderer in zip(filepaths, tags, renderers)
+            )
+        )
 
-                    vehicle_name2, found2 = get_vehicle(log[6])
-                    killer = Color.GREEN(
-                        vehicle_name2 if found2 else clean_name(log[6])[0]
-                    )
-                    dmgtype = Color.CYAN(log[7])
-                    print(
-                        f"{when}{VKILL}: {killer} {kill_type} a {driver}{vehicle} with {dmgtype} {lp} {Color.YELLOW(location)}"
-                    )
-                elif log_type == "RESPAWN":
-                    # datetime, player, location
-                    whom = Color.GREEN(log[2])
-                    _, where, _ = clean_location(log[3])
-                    print(f"{when}{RESPAWN}: {whom} from {Color.YELLOW(where)}")
-                elif log_type == "INCAP":
-                    # datetime, player, causes
-                    whom = Color.GREEN(log[2])
-                    causes = LOG_INCAP_CAUSE.findall(log[3])
-                    print(
-                        f"{when}{INCAP}: {whom} from {', '.join([Color.YELLOW(cause[0].replace('Damage', '')) for cause in causes])}"
-                    )
-                elif log_type == "QUITLOBBY":
-                    whom = Color.GREEN(log[2])
-                    print(f"{when}{QUIT}: {whom} has quit the game session.")
-                elif log_type == "SPAWN":
-                    print(f"{when}{SPAWNED}: Character spawned!")
-                elif log_type == "JUMP":
-                    whom = Color.GREEN(log[2])
-                    origin = Color.BLUE(log[3], bold=True)
-                    dest = Color.BLUE(log[4], bold=True)
-                    print(
-                        f"{when}{JUMP}: {whom} has departed {origin} for the {dest} system."
-                    )
-                elif log_type == "CONNECTING":
-                    print(f"{when}{CONNECT}: Connecting...")
-                elif log_type == "CONNECTED":
-                    print(f"{when}{CONNECT}: Connected!")
-                elif log_type == "LOADING":
-                    print(f"{when}{LOAD}: Loading...")
-                elif log_type == "LOADED":
-                    what = Color.GREEN(LOADED_ITEM.get(log[2], log[2]))
-                    running_time_text = Color.GREEN(
-                        str(timedelta(seconds=float(log[3]))).rstrip("0")
-                    )
-                    print(
-                        f"{when}{LOAD}: Loaded! {what} took {running_time_text} to load."
+    try:
+        asyncio.run(follow_all())
+    except KeyboardInterrupt:
+        pass
+
+
+def scan(filepath: str, jobs: int = 1, output_format: str = "text") -> None:
+    """
+    Prints every event in a finished log, then returns.
+
+    Args:
+        filepath: The log to read.
+        jobs: The number of processes to parse with. With 1, events are
+            printed as the file is read, in constant memory.
+        output_format: The name of the format in RENDERERS to print in.
+    """
+    renderer = RENDERERS[output_format]
+    try:
+        with OUTPUT:
+            print_events(
+                (
+                    (event_type, text)
+                    for _, event_type, text in scan_parallel(
+                        filepath, renderer.format, jobs
                     )
-                elif log_type == "QUIT":
-                    print(f"{when}{QUIT}: Game quit.")
-                elif log_type == "QUANTUM":
-                    name = Color.GREEN(log[2])
-                    dest = Color.YELLOW(clean_location(log[3])[1])
-                    print(f"{when}{QUANTUM}: {name} started quantum travel to {dest}")
-                else:
-                    continue
-                is_prev_line_cet = False
+                ),
+                overwrite_cet=renderer.overwrite_cet,
+            )
     except KeyboardInterrupt:
         pass
     except FileNotFoundError:
-        print(Color.RED(f'Log file "{filepath}" not found.'))
-    finally:
-        try:
-            f.close()
-        except UnboundLocalError:
-            pass
+        print(Color.RED(f'Log file "{filepath}" not found.'), file=sys.stderr)
+
+
+def print_stats() -> None:
+    """
+    Prints how often each pattern was tried, and how often it matched, then
+    how often each name cache was used.
+    """
+    print(f"\n{'EVENT'.rjust(10)} {'HITS'.rjust(8)} {'MISSES'.rjust(8)}")
+    for event_type in SCLogParser.EVENT_TYPES:
+        hits = SCLogParser.hits[event_type]
+        misses = SCLogParser.misses[event_type]
+        print(
+            f"{event_type.rjust(10)} {Color.GREEN(str(hits).rjust(8))} {Color.YELLOW(str(misses).rjust(8))}"
+        )
+    print(
+        f"\n{'CACHE'.rjust(14)} {'HITS'.rjust(8)} {'MISSES'.rjust(8)} {'EVICTED'.rjust(8)}"
+    )
+    for name, cache in CACHES.items():
+        print(
+            f"{name.rjust(14)} {Color.GREEN(str(cache.hits).rjust(8))} {Color.YELLOW(str(cache.misses).rjust(8))} {str(cache.evictions).rjust(8)}"
+        )
 
 
 TRY_FILES = [
     "Game.log",
     R"C:\Program Files\Roberts Space Industries\StarCitizen\HOTFIX\Game.log",
     R"C:\Program Files\Roberts Space Industries\StarCitizen\LIVE\Game.log",
+    R"C:\Program Files\Roberts Space Industries\StarCitizen\PTU\Game.log",
+    R"C:\Program Files\Roberts Space Industries\StarCitizen\EPTU\Game.log",
 ]
 
 
@@ -419,23 +924,109 @@ def find_game_log() -> str | None:
     return None
 
 
-if __name__ == "__main__":
-    # Set window title and cursor shape
-    print("\x1b]0;all-slain\x07\x1b[2\x20q", end="")
+def find_game_logs() -> list[str]:
+    """
+    Returns:
+        Every log in TRY_FILES that exists, each file only once.
+    """
+    found: list[str] = []
+    for file in TRY_FILES:
+        if os.path.isfile(file) and not any(
+            os.path.samefile(file, other) for other in found
+        ):
+            found.append(file)
+    return found
 
-    print(f"{Color.BLUE("Talie's baby", bold = True)}: Star Citizen Game Log Reader \n")
+
+def get_install(filepath: str) -> str:
+    """
+    Returns:
+        The name of the install a log belongs to, such as LIVE or PTU, which
+        is the name of the folder it's in.
+    """
+    return os.path.basename(os.path.dirname(os.path.abspath(filepath)))
+
+
+if __name__ == "__main__":
+    # Worker processes of a frozen executable start here too
+    freeze_support()
 
     parser = ArgumentParser()
-    parser.add_argument("file", nargs="?")
+    parser.add_argument(
+        "file",
+        nargs="*",
+        help="logs to read (default: every log found in the default locations)",
+    )
+    parser.add_argument(
+        "--stats", action="store_true", help="show parser statistics on exit"
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="read the whole log and exit instead of following it",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of processes for --scan (default: 1)",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="read the log from the start instead of where the last run stopped",
+    )
+    parser.add_argument(
+        "--tail",
+        type=int,
+        metavar="N",
+        help="show only the last N events, then follow the log",
+    )
+    parser.add_argument(
+        "--from-end",
+        action="store_const",
+        const=0,
+        dest="tail",
+        help="follow the log from its end, without showing past events",
+    )
+    parser.add_argument(
+        "--format",
+        choices=RENDERERS,
+        default="text",
+        help="print events as colored text, or as one JSON object per line (default: text)",
+    )
     args = parser.parse_args()
 
-    if filename := args.file if args.file else find_game_log():
-        print(f'Reading "{Color.CYAN(filename)}"\n')
-        main(filename)
+    # Only events go to stdout as JSON lines, for other programs to read
+    console = sys.stderr if args.format == "jsonl" else sys.stdout
+
+    if console is sys.stdout:
+        # Set window title and cursor shape
+        print("\x1b]0;all-slain\x07\x1b[2\x20q", end="")
+
+    print(
+        f"{Color.BLUE("Talie's baby", bold = True)}: Star Citizen Game Log Reader \n",
+        file=console,
+    )
+
+    if filenames := args.file if args.file else find_game_logs():
+        for filename in filenames:
+            print(f'Reading "{Color.CYAN(filename)}"', file=console)
+        print(file=console)
+        if args.scan:
+            for filename in filenames:
+                scan(filename, args.jobs, args.format)
+        else:
+            main(filenames, args.replay, args.tail, args.format)
+        if args.stats:
+            with redirect_stdout(console):
+                print_stats()
     else:
-        print(Color.RED("No log files found in the default locations."))
+        print(Color.RED("No log files found in the default locations."), file=console)
         print(
-            "Run this again from within the game folder after starting the game, or specify a game log to read."
+            "Run this again from within the game folder after starting the game, or specify a game log to read.",
+            file=console,
         )
 
 # vim: set expandtab ts=4 sw=4
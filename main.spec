@@ -1,4 +1,15 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+import sys
+
+sys.path.insert(0, SPECPATH)
+import data
+
+# Written to the build directory rather than the source tree, and bundled
+# with the data folder, so the tables load without importing them
+os.makedirs(workpath, exist_ok=True)
+snapshot = os.path.join(workpath, os.path.basename(data.SNAPSHOT))
+data.save_snapshot(snapshot)
 
 
 a = Analysis(
@@ -6,7 +17,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[
-        ('data', 'data'),  # This tells PyInstaller to include the data folder
+        ('data/*.py', 'data'),  # This tells PyInstaller to include the data folder
+        (snapshot, 'data'),
     ],
     hiddenimports=[
         'data.locations',
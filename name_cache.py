@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+This module provides a bounded cache for the functions that clean up entity
+names, such as clean_name() and get_vehicle().
+
+The same ships, NPCs and zones show up over and over in a session, but each
+spawn has its own entity ID at the end of its name, so a cache keyed on the
+raw name would rarely hit. Names are cached with that ID taken out instead,
+and the ID is put back into the cached result when it's reused.
+
+Classes:
+    NameCache: An LRU cache for a function of one entity name.
+
+Functions:
+    cache_name: Decorator that wraps a function in a NameCache.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T", bound=tuple)
+
+# Entity IDs are at least this many digits, after the last "_" of a name
+ID_LENGTH = 12
+
+# Entries each NameCache keeps by default
+MAXSIZE = 4096
+
+# Every NameCache created, by the name of the function it wraps
+CACHES: dict[str, "NameCache"] = {}
+
+
+class NameCache(Generic[T]):
+    """
+    Caches the results of a function of an entity name, keyed on the name
+    without its trailing entity ID, evicting the least recently used entry
+    once there are `maxsize`.
+
+    Results are cached whatever they are, including the ones that mean the
+    name wasn't recognized. The function's result must be a tuple, and must
+    depend only on the name; any copy of the ID in the strings it contains is
+    replaced with the ID of the name it's reused for.
+
+    Attributes:
+        hits: How many calls were answered from the cache.
+        misses: How many calls ran the function.
+        evictions: How many entries were dropped to make room.
+    """
+
+    def __init__(self, func: Callable[[str], T], maxsize: int = MAXSIZE) -> None:
+        self.func = func
+        self.maxsize = maxsize
+        # Key -> (result, the ID it was computed with, indexes of the items
+        # of the result that contain the ID)
+        self.entries: OrderedDict[str, tuple[T, str, tuple[int, ...]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+        self.__wrapped__ = func
+        CACHES[func.__name__] = self
+
+    def __call__(self, name: str) -> T:
+        head, _, entity_id = name.rpartition("_")
+        if len(entity_id) >= ID_LENGTH and entity_id.isdecimal():
+            # Can't be in a name, so this can't be the key of a name without ID
+            key = head + "\0"
+        else:
+            key, entity_id = name, ""
+        try:
+            result, cached_id, with_id = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            result = self.func(name)
+            with_id = ()
+            if entity_id:
+                with_id = tuple(
+                    i
+                    for i, item in enumerate(result)
+                    if isinstance(item, str) and entity_id in item
+                )
+            self.entries[key] = (result, entity_id, with_id)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            return result
+        self.hits += 1
+        self.entries.move_to_end(key)
+        if not with_id or cached_id == entity_id:
+            return result
+        items = list(result)
+        for i in with_id:
+            items[i] = items[i].replace(cached_id, entity_id)
+        return tuple(items)  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        """Empties the cache and resets its counters."""
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+def cache_name(func: Callable[[str], T]) -> NameCache[T]:
+    """Wraps a function of an entity name in a NameCache of MAXSIZE entries."""
+    return NameCache(func)
+
+
+# vim: set expandtab ts=4 sw=4
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+This module provides a lookup for class names that are variants of a known
+class, such as weapon skins that were added after the data was extracted.
+
+Variants are named after the class they're based on, with more parts added
+after a "_", e.g. "behr_rifle_ballistic_01_tan01" is a skin of
+"behr_rifle_ballistic_01". So the longest known class that a name starts
+with, up to a "_", is the class it's a variant of.
+
+Classes:
+    PrefixIndex: Finds the longest key of a mapping that a name starts with.
+"""
+
+from collections.abc import Mapping
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class PrefixIndex(Generic[V]):
+    """
+    Finds the longest key of a mapping that is a name, or that a name starts
+    with followed by a separator.
+
+    Only the separators within the length of the longest key are tried, each
+    with one dict lookup, so a lookup takes time proportional to the length
+    of the longest key, however many keys there are and however long the
+    name is.
+
+    Args:
+        mapping: The known names and their values. It's copied, so later
+            changes to it aren't seen.
+        separator: What the parts of a name are separated by.
+    """
+
+    def __init__(self, mapping: Mapping[str, V], separator: str = "_") -> None:
+        self.mapping = dict(mapping)
+        self.separator = separator
+        self.longest = max(map(len, self.mapping), default=0)
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.mapping
+
+    def __getitem__(self, name: str) -> V:
+        return self.mapping[name]
+
+    def longest_prefix(self, name: str) -> tuple[str, V] | None:
+        """
+        Returns:
+            A tuple (key, value) for the name itself if it's a key, otherwise
+            for the longest key the name starts with followed by the
+            separator, or None if there isn't one.
+        """
+        try:
+            return (name, self.mapping[name])
+        except KeyError:
+            pass
+        end = name.rfind(self.separator, 0, self.longest + 1)
+        while end > 0:
+            prefix = name[:end]
+            try:
+                return (prefix, self.mapping[prefix])
+            except KeyError:
+                end = name.rfind(self.separator, 0, end)
+        return None
+
+
+# vim: set expandtab ts=4 sw=4
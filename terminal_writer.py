@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+This module provides a writer that prints lines in batches.
+
+Printing each event on its own is a write to the terminal per line, and on a
+console a redraw per line, which is most of the cost of catching up on a
+long log. Lines are collected instead, and written together.
+
+Lines that show progress in place, each printed over the one before, are
+drawn at most every UPDATE_INTERVAL seconds, with the latest step; the
+steps in between are skipped.
+
+Classes:
+    TerminalWriter: Collects lines and writes them in batches.
+"""
+
+import sys
+import time
+from typing import TextIO
+
+# Flush once this many characters are waiting
+FLUSH_SIZE = 64 * 1024
+
+# Flush when a line is written this many seconds after the oldest waiting one
+FLUSH_INTERVAL = 0.1
+
+# Draw a progress update at most once per this many seconds
+UPDATE_INTERVAL = 0.25
+
+# Moves the cursor up a line, and clears it
+OVERWRITE = "\x1b[1A\x1b[2K"
+
+
+class TerminalWriter:
+    """
+    Collects lines to print, and writes them all at once when FLUSH_SIZE
+    characters are waiting, when a line comes FLUSH_INTERVAL seconds after
+    the oldest waiting one, or when flush() is called.
+
+    Whoever writes should call flush() once it has nothing more to write for
+    now, e.g. when it has caught up with a log, so that lines are never held
+    back while waiting for more; see update() for the exception. It's also a
+    context manager that flushes on exit.
+
+    Args:
+        stream: Where to write. Defaults to whatever sys.stdout is when
+            flushing.
+        flush_size: See FLUSH_SIZE.
+        flush_interval: See FLUSH_INTERVAL.
+        update_interval: See UPDATE_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        flush_size: int = FLUSH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        update_interval: float = UPDATE_INTERVAL,
+    ) -> None:
+        self.stream = stream
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.update_interval = update_interval
+        self.pending: list[str] = []
+        self.size = 0
+        self.deadline = 0.0
+        # If the last line waiting was printed with update(), whether it goes
+        # over the line before it; None otherwise
+        self.update_over: bool | None = None
+        # When an update was last written
+        self.updated = float("-inf")
+
+    def write(self, text: str) -> None:
+        """Writes text, without adding a newline."""
+        self._append(text, None)
+
+    def print(self, text: str) -> None:
+        """Writes a line."""
+        self._append(text + "\n", None)
+
+    def update(self, text: str, over: bool = True) -> None:
+        """
+        Writes a line that shows the latest step of something in progress.
+
+        If the line it goes over was printed with update() too and hasn't
+        been written yet, it's replaced, so that the terminal never draws it.
+        An update that would be drawn less than update_interval seconds after
+        the last one is held back, until a later write or flush with
+        hold_update, or any flush without.
+
+        Args:
+            text: The line.
+            over: Whether to print it over the line before it.
+        """
+        replace = False
+        if over and self.update_over is not None:
+            over, replace = self.update_over, True
+        self._append((OVERWRITE if over else "") + text + "\n", over, replace)
+
+    def _append(
+        self, text: str, update_over: bool | None, replace: bool = False
+    ) -> None:
+        if replace:
+            # Still due when the line it replaces was
+            self.size -= len(self.pending.pop())
+        elif not self.pending:
+            self.deadline = time.monotonic() + self.flush_interval
+        self.pending.append(text)
+        self.size += len(text)
+        self.update_over = update_over
+        if self.size >= self.flush_size or time.monotonic() >= self.deadline:
+            self.flush(hold_update=True)
+
+    def flush(self, hold_update: bool = False) -> None:
+        """
+        Writes everything waiting, at once.
+
+        Args:
+            hold_update: Whether to keep waiting a last line printed with
+                update() that would be drawn too soon after the last one.
+        """
+        if not self.pending:
+            return
+        held = None
+        if self.update_over is not None:
+            now = time.monotonic()
+            if hold_update and now < self.updated + self.update_interval:
+                held = self.pending.pop()
+            else:
+                self.updated = now
+                self.update_over = None
+        text = "".join(self.pending)
+        self.pending.clear()
+        self.size = 0
+        if held is not None:
+            self.pending.append(held)
+            self.size = len(held)
+            self.deadline = self.updated + self.update_interval
+        if text:
+            stream = self.stream or sys.stdout
+            stream.write(text)
+            stream.flush()
+
+    def __enter__(self) -> "TerminalWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.flush()
+
+
+# vim: set expandtab ts=4 sw=4
@@ -1,16 +1,38 @@
 #!/usr/bin/env python3
+import asyncio
+from contextlib import redirect_stdout
+import io
+import json
+import os
+import random
+import tempfile
 import unittest
+from unittest import mock
 
+import checkpoint
 from main import (
     clean_location,
     clean_name,
+    CLEAN_NAME_RULES,
+    compile_rules,
     find_game_log,
+    find_game_logs,
+    follow_log,
+    format_lines,
+    get_debris_ship,
+    get_install,
     get_vehicle,
+    JsonRenderer,
     LOG_ENCODING,
     LOG_NEWLINE,
+    print_events,
+    RE_SHIP_DEBRIS,
     RE_VEHICLE_NAME,
     remove_id,
+    split_vehicle_name,
 )
+from terminal_writer import TerminalWriter
+import test_log_parser
 
 
 @unittest.skipUnless(find_game_log(), "No game logs are available.")
@@ -123,6 +145,65 @@ class TestVehicleNameRegex(unittest.TestCase):
         self.assertEqual(result[3], "1234567890123")
 
 
+class TestVehicleNameParsing(unittest.TestCase):
+    PIECES = [
+        "_",
+        "__",
+        "PU",
+        "EA",
+        "_AI_",
+        "CRIM",
+        "_QIG",
+        "NT_NonLethal",
+        "PIR_Elite",
+        "VAN_Alpha",
+        "_PU_",
+        "_EA_",
+        "123456789012",
+        "1234567890123",
+        "12345678901",
+        "ANVL_Arrow",
+        "SCItem_Debris_",
+    ]
+
+    def names(self, count=20000):
+        rng = random.Random(0)
+        for _ in range(count):
+            name = "".join(rng.choices(self.PIECES, k=rng.randint(1, 8)))
+            if rng.random() < 0.3:
+                name = "SCItem_Debris_123456789012_" + name
+            yield name
+
+    def test_same_as_regex(self):
+        for name in self.names():
+            with self.subTest(name=name):
+                match = RE_VEHICLE_NAME.match(name)
+                self.assertEqual(
+                    split_vehicle_name(name), match and (match[1], match[2])
+                )
+                match = RE_SHIP_DEBRIS.match(name)
+                self.assertEqual(get_debris_ship(name), match and match[1])
+
+    def test_ai_suffix_without_underscore(self):
+        self.assertEqual(
+            split_vehicle_name("PU_AI_CRIM_123456789012"), ("", "PU_AI_CRIM")
+        )
+
+    def test_debris_suffix(self):
+        self.assertEqual(
+            get_debris_ship(
+                "SCItem_Debris_123456789012_ANVL_Arrow_PU_x_123456789012_a"
+            ),
+            "ANVL_Arrow",
+        )
+
+    def test_long_names(self):
+        # Would take minutes with RE_SHIP_DEBRIS, which backtracks quadratically
+        name = "SCItem_Debris_123456789012_" + "_PU_" * 200000
+        self.assertIsNone(get_debris_ship(name))
+        self.assertIsNone(split_vehicle_name("_" * 200000))
+
+
 class TestGetVehicleNameFunction(unittest.TestCase):
     def test_get_vehicle_salvage(self):
         result = get_vehicle("ANVL_Arrow_Unmanned_Salvage_123456789012")
@@ -183,5 +264,193 @@ class TestGetHazardNames(unittest.TestCase):
         self.assertEqual(result[1], 1)
 
 
+class TestNameRules(unittest.TestCase):
+    RULES = [
+        ("exact", "a", "exact a"),
+        ("prefix", "b_", "prefix b"),
+        ("contains", "_c_", "contains c"),
+        ("regex", r"d-\d{2}", "regex d"),
+        ("contains", "_e_", "contains e"),
+        ("prefix", "f_", "prefix f"),
+    ]
+
+    def setUp(self):
+        self.classify = compile_rules(self.RULES)
+
+    def test_kinds(self):
+        self.assertEqual(self.classify("a"), 0)
+        self.assertIsNone(self.classify("ab"))
+        self.assertEqual(self.classify("b_x"), 1)
+        self.assertEqual(self.classify("x_c_x"), 2)
+        self.assertEqual(self.classify("d-12x"), 3)
+        self.assertIsNone(self.classify("d-1x"))
+        self.assertIsNone(self.classify("x_d-12"))
+        self.assertIsNone(self.classify("player"))
+
+    def test_precedence(self):
+        # Earlier rules win, whatever their kind
+        self.assertEqual(self.classify("b__c_"), 1)
+        self.assertEqual(self.classify("d-12_c_"), 2)
+        self.assertEqual(self.classify("f__e_"), 4)
+        self.assertEqual(self.classify("f__e__c_"), 2)
+
+    def test_capturing_group(self):
+        with self.assertRaises(ValueError):
+            compile_rules([("regex", r"(x)", "x")])
+
+    def test_every_rule_reachable(self):
+        classify = compile_rules(CLEAN_NAME_RULES)
+        for i, (kind, pattern, _) in enumerate(CLEAN_NAME_RULES):
+            if kind == "regex":
+                continue
+            with self.subTest(pattern=pattern):
+                self.assertEqual(classify(pattern), i)
+
+    def test_pilot_criminal(self):
+        self.assertEqual(clean_name("PU_Pilot_Criminal_Gunner_123")[0], "NPC Gunner")
+        self.assertEqual(
+            clean_name("Bad_pyro_outlaw_Pilot_Criminal_Pilot")[0], "NPC Pilot"
+        )
+
+
+CET_LINE = '<2024-12-23T00:00:42.593Z> [Notice] <ContextEstablisherTaskFinished> establisher="CReplicationModel" message="CET completed" taskname="StreamingFinished" state=eCVS_InGame(15) status="Finished" runningTime=42.5 numRuns=1 map="megamap" gamerules="SC_Default" sessionId="00000000" [Team_Network][Network][Replication][Loading][Persistence]'
+
+
+class TestPrintEvents(unittest.TestCase):
+    EVENTS = [("CET", "a"), ("CET", "b"), ("KILLP", "c"), ("CET", "d")]
+
+    def print_events(self, **kwargs) -> tuple[bool, str]:
+        stream = io.StringIO()
+        with TerminalWriter(stream) as output:
+            is_cet = print_events(self.EVENTS, output=output, **kwargs)
+        return (is_cet, stream.getvalue())
+
+    def test_overwrite_cet(self):
+        # Only the last of a burst of them is drawn
+        self.assertEqual(self.print_events(), (True, "b\nc\nd\n"))
+        self.assertEqual(
+            self.print_events(is_prev_line_cet=True),
+            (True, "\x1b[1A\x1b[2Kb\nc\nd\n"),
+        )
+
+    def test_overwrite_written_cet(self):
+        stream = io.StringIO()
+        output = TerminalWriter(stream, update_interval=0)
+        is_cet = False
+        for event in self.EVENTS:
+            is_cet = print_events([event], is_cet, output)
+            output.flush()
+        self.assertEqual(stream.getvalue(), "a\n\x1b[1A\x1b[2Kb\nc\nd\n")
+
+    def test_no_overwrite_cet(self):
+        self.assertEqual(
+            self.print_events(is_prev_line_cet=True, overwrite_cet=False),
+            (True, "a\nb\nc\nd\n"),
+        )
+
+
+class TestFollowLogs(unittest.IsolatedAsyncioTestCase):
+    INSTALLS = ["LIVE", "PTU"]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = mock.patch(
+            "checkpoint.CHECKPOINT_DIR", os.path.join(directory.name, "checkpoints")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.logs = []
+        for install in self.INSTALLS:
+            os.mkdir(os.path.join(directory.name, install))
+            self.logs.append(os.path.join(directory.name, install, "Game.log"))
+            with open(self.logs[-1], "w", encoding=LOG_ENCODING, newline="") as f:
+                f.write(LOG_NEWLINE.join(test_log_parser.TestBytes.LINES) + LOG_NEWLINE)
+        self.expected = [
+            text for _, text in format_lines(test_log_parser.TestBytes.LINES)
+        ]
+
+    def test_get_install(self):
+        self.assertEqual(list(map(get_install, self.logs)), self.INSTALLS)
+
+    def test_find_game_logs(self):
+        with mock.patch("main.TRY_FILES", [self.logs[0], *self.logs, "missing.log"]):
+            self.assertEqual(find_game_logs(), self.logs)
+
+    async def follow_all(self, **kwargs) -> list[str]:
+        """Follows every log at once, each with its own follow_log() arguments."""
+        printed = {}
+        output = io.StringIO()
+        with redirect_stdout(output):
+            tasks = [
+                asyncio.create_task(
+                    follow_log(
+                        log,
+                        printed=printed,
+                        **{name: value[i] for name, value in kwargs.items()},
+                    )
+                )
+                for i, log in enumerate(self.logs)
+            ]
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if output.getvalue().count("\n") == 2 * len(self.expected):
+                    break
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return output.getvalue().splitlines()
+
+    async def test_resumed_cet(self):
+        # Saved after a CET line, by a run that used a different screen
+        with open(self.logs[0], "rb") as f:
+            checkpoint.save(f, os.path.getsize(self.logs[0]))
+        with open(self.logs[0], "a", encoding=LOG_ENCODING, newline="") as f:
+            f.write(CET_LINE + LOG_NEWLINE)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            # Even if this log printed the last line of this run
+            task = asyncio.create_task(follow_log(self.logs[0], printed={"tag": ""}))
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if output.getvalue():
+                    break
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.assertIn("Complete", output.getvalue())
+        self.assertNotIn("\x1b[1A", output.getvalue())
+
+    async def test_tagged(self):
+        lines = await self.follow_all(
+            tag=[f"[{install}] " for install in self.INSTALLS]
+        )
+        for install in self.INSTALLS:
+            tag = f"[{install}] "
+            self.assertEqual(
+                [line[len(tag) :] for line in lines if line.startswith(tag)],
+                self.expected,
+            )
+
+    async def test_jsonl(self):
+        lines = await self.follow_all(
+            renderer=[JsonRenderer(install) for install in self.INSTALLS]
+        )
+        records = [json.loads(line) for line in lines]
+        for install in self.INSTALLS:
+            self.assertEqual(
+                [
+                    json.dumps(record, separators=(",", ":"))
+                    for record in records
+                    if record["install"] == install
+                ],
+                [
+                    text
+                    for _, text in format_lines(
+                        test_log_parser.TestBytes.LINES, JsonRenderer(install)
+                    )
+                ],
+            )
+
+
 if __name__ == "__main__":
     unittest.main()
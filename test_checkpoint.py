@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+import unittest
+
+import checkpoint
+from log_parser import LOG_ENCODING, LOG_NEWLINE
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.log = os.path.join(self.directory.name, "Game.log")
+        self.write("<2024-12-23T00:00:00.000Z> Log started" + LOG_NEWLINE, "w")
+        self.f = open(self.log, "r", encoding=LOG_ENCODING, newline=LOG_NEWLINE)
+        self.addCleanup(self.f.close)
+        self.saves = os.path.join(self.directory.name, "checkpoints")
+
+    def write(self, text, mode="a"):
+        with open(self.log, mode, encoding=LOG_ENCODING, newline="") as f:
+            f.write(text)
+
+    def test_round_trip(self):
+        self.assertIsNone(checkpoint.load(self.f, self.saves))
+        self.write("x" * 1000 + LOG_NEWLINE)
+        self.assertTrue(checkpoint.save(self.f, 30, self.saves))
+        self.assertEqual(checkpoint.load(self.f, self.saves), 30)
+
+    def test_short_head(self):
+        # Saved before the file was HEAD_SIZE bytes long, loaded after
+        self.assertTrue(checkpoint.save(self.f, 30, self.saves))
+        self.write("x" * 1000 + LOG_NEWLINE)
+        self.assertEqual(checkpoint.load(self.f, self.saves), 30)
+
+    def test_rotated(self):
+        checkpoint.save(self.f, 30, self.saves)
+        os.replace(self.log, self.log + ".bak")
+        self.write("<2024-12-24T00:00:00.000Z> Log started" + LOG_NEWLINE, "w")
+        with open(self.log, "r", encoding=LOG_ENCODING, newline=LOG_NEWLINE) as f:
+            self.assertIsNone(checkpoint.load(f, self.saves))
+        # The file that was moved away doesn't match its old path any more
+        self.assertIsNone(checkpoint.identify(self.f))
+        self.assertFalse(checkpoint.save(self.f, 30, self.saves))
+
+    def test_shrunk(self):
+        checkpoint.save(self.f, 1000, self.saves)
+        self.assertIsNone(checkpoint.load(self.f, self.saves))
+
+    def test_corrupt(self):
+        path = checkpoint.checkpoint_path(self.log, self.saves)
+        os.makedirs(self.saves)
+        with open(path, "w") as f:
+            f.write("{")
+        self.assertIsNone(checkpoint.load(self.f, self.saves))
+
+    def test_path_per_log(self):
+        self.assertNotEqual(
+            checkpoint.checkpoint_path("LIVE/Game.log", self.saves),
+            checkpoint.checkpoint_path("PTU/Game.log", self.saves),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
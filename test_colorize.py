@@ -58,6 +58,36 @@ class TestNameFunctions(unittest.TestCase):
         for parse_str, valid_str in zip(test_strings, valid_strings):
             self.assertEqual(parse_str, valid_str)
 
+    def test_call_every_combination(self):
+        for color in Color:
+            for bg in (None, *Color):
+                for bold in (False, True):
+                    for bg_bold in (False, True):
+                        with self.subTest(
+                            color=color, bg=bg, bold=bold, bg_bold=bg_bold
+                        ):
+                            self.assertEqual(
+                                color("hello", bold=bold, bg=bg, bg_bold=bg_bold),
+                                f"{color._sequence(bold, bg, bg_bold)}hello\x1b[0m",
+                            )
+
+    def test_black_bg_ignored(self):
+        self.assertEqual(Color.WHITE("hello", bg=Color.BLACK), Color.WHITE("hello"))
+        self.assertEqual(
+            Color.WHITE("hello", bg=Color.BLACK, bg_bold=True),
+            "\x1b[37mhello\x1b[0m",
+        )
+
+    def test_parse_tags(self):
+        self.assertEqual(Color.parse("(Xb)a(Xf)"), "\x1b[0ma\x1b[0m")
+        self.assertEqual(Color.parse("(Kf)a(Kb)"), "\x1b[30ma\x1b[40m")
+        self.assertEqual(Color.parse("(R)(R)(R)"), "\x1b[31m" * 3)
+
+    def test_parse_not_tags(self):
+        for text in ("", "(r)", "(Rx)", "(RB)", "((R)", "R)", "(Z)"):
+            with self.subTest(text=text):
+                self.assertEqual(Color.parse(text), text.replace("(R)", "\x1b[31m"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import data
+from data import TABLES
+
+
+class TestData(unittest.TestCase):
+    def setUp(self):
+        fd, self.snapshot = tempfile.mkstemp(suffix=".marshal")
+        os.close(fd)
+        self.addCleanup(os.remove, self.snapshot)
+        self.tables = {
+            name: getattr(importlib.import_module(f"data.{module}"), name)
+            for name, module in TABLES.items()
+        }
+
+    def test_snapshot(self):
+        data.save_snapshot(self.snapshot)
+        self.assertEqual(data._read_snapshot(self.snapshot), self.tables)
+        self.assertEqual(data.load(self.snapshot), self.tables)
+
+    def test_stale_snapshot(self):
+        data.save_snapshot(self.snapshot)
+        os.utime(self.snapshot, (0, 0))
+        self.assertIsNone(data._read_snapshot(self.snapshot))
+        self.assertEqual(data.load(self.snapshot), self.tables)
+
+    def test_bad_snapshot(self):
+        for contents in (b"", b"\xff\x00", b"N"):
+            with self.subTest(contents=contents):
+                with open(self.snapshot, "wb") as f:
+                    f.write(contents)
+                self.assertIsNone(data._read_snapshot(self.snapshot))
+                self.assertEqual(data.load(self.snapshot), self.tables)
+
+    def test_missing_snapshot(self):
+        self.assertIsNone(data._read_snapshot(self.snapshot + ".missing"))
+
+    def test_tables(self):
+        for name, table in self.tables.items():
+            self.assertEqual(getattr(data, name), table)
+        with self.assertRaises(AttributeError):
+            data.MISSING
+
+    def test_lazy(self):
+        # The tables aren't imported until one of them is used
+        code = (
+            "import sys, main; "
+            "print(sorted(m for m in sys.modules if m.startswith('data.'))); "
+            "main.clean_name('ANVL_Arrow_123456789012'); "
+            "print('data.ships' in sys.modules or 'SHIPS' in vars(main.data))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True,
+        )
+        self.assertEqual(result.stdout.split(), ["[]", "True"])
+
+
+if __name__ == "__main__":
+    unittest.main()
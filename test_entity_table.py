@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import unittest
+
+from datetime import datetime
+import pickle
+
+from entity_table import EntityTable
+from events import make_event
+from log_parser import SCLogParser
+from main import clean_name, JsonRenderer, MAX_ENTITIES, RENDERER, TerminalRenderer
+import test_log_parser
+
+
+class TestEntityTable(unittest.TestCase):
+    def test_intern(self):
+        table = EntityTable()
+        self.assertEqual(table.intern("a"), 0)
+        self.assertEqual(table.intern("b"), 1)
+        self.assertEqual(table.intern("a"), 0)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table[1], "b")
+        self.assertEqual(list(table), ["a", "b"])
+        self.assertIn("a", table)
+        self.assertNotIn("c", table)
+
+    def test_initial_names(self):
+        table = EntityTable(["x", "y", "x"])
+        self.assertEqual(table.names, ["x", "y"])
+        self.assertEqual(table.ids, {"x": 0, "y": 1})
+
+    def test_canonical(self):
+        table = EntityTable()
+        first = "".join(["Player-123", "_Name"])
+        second = "".join(["Player-12", "3_Name"])
+        self.assertIsNot(first, second)
+        self.assertIs(table.canonical(first), first)
+        self.assertIs(table.canonical(second), first)
+
+    def test_map(self):
+        table = EntityTable(["a1", "b1", "a2", "c"])
+        results, ids = table.map(lambda name: name[0])
+        self.assertEqual(results.names, ["a", "b", "c"])
+        self.assertEqual(ids.tolist(), [0, 1, 0, 2])
+
+    def test_map_calls_once(self):
+        calls = []
+        table = EntityTable(["a", "b"])
+        for name in ["a", "b", "a", "a"]:
+            table.intern(name)
+        table.map(lambda name: calls.append(name) or name)
+        self.assertEqual(calls, ["a", "b"])
+
+    def test_apply(self):
+        calls = []
+
+        def upper(name):
+            calls.append(name)
+            return name.upper()
+
+        table = EntityTable()
+        self.assertEqual([table.apply(upper, n) for n in "abab"], list("ABAB"))
+        self.assertEqual(calls, ["a", "b"])
+        self.assertEqual(table.apply(len, "a"), 1)
+        self.assertEqual(table.names, ["a", "b"])
+
+
+class TestInterned(unittest.TestCase):
+    FIELDS = ("killed_1", "zone", "killer_1", "weapon", "Bullet", "x: 1")
+
+    def copy(self, fields):
+        return tuple("".join(list(field)) for field in fields)
+
+    def test_make_event(self):
+        table = EntityTable()
+        timestamp = datetime(2024, 12, 23)
+        first = make_event("KILLP", self.copy(self.FIELDS), timestamp, table)
+        second = make_event("KILLP", self.copy(self.FIELDS), timestamp, table)
+        self.assertIs(first.killer, second.killer)
+        self.assertIs(first.zone, second.zone)
+        # Only names are interned
+        self.assertIsNot(first.direction, second.direction)
+        self.assertEqual(table.names, ["killed_1", "zone", "killer_1", "weapon"])
+
+    def test_renderer(self):
+        renderer = TerminalRenderer()
+        for line in test_log_parser.TestBytes.LINES:
+            if match := SCLogParser.find_match(line):
+                self.assertEqual(
+                    renderer.format(match[0], match[1].groups(), match[2]),
+                    RENDERER.render(SCLogParser.parse_event(line)),
+                )
+        self.assertIn("Player-123_Name", renderer.entities)
+        self.assertIn(clean_name, renderer.entities.results)
+
+    def test_limit(self):
+        renderer = TerminalRenderer()
+        renderer.entities = EntityTable(map(str, range(MAX_ENTITIES)))
+        match = SCLogParser.find_match(test_log_parser.TestBytes.LINES[0])
+        renderer.format(match[0], match[1].groups(), match[2])
+        self.assertLess(len(renderer.entities), MAX_ENTITIES)
+
+    def test_pickle(self):
+        renderer = JsonRenderer("LIVE")
+        match = SCLogParser.find_match(test_log_parser.TestBytes.LINES[0])
+        line = renderer.format(match[0], match[1].groups(), match[2])
+        copy = pickle.loads(pickle.dumps(renderer))
+        self.assertEqual(copy.install, "LIVE")
+        self.assertEqual(len(copy.entities), 0)
+        self.assertEqual(copy.format(match[0], match[1].groups(), match[2]), line)
+
+
+class TestParsedLinesEntities(unittest.TestCase):
+    def test_clean(self):
+        lines = SCLogParser.parse_lines(test_log_parser.TestBytes.LINES)
+        cleaned, ids = lines.entities.map(lambda name: clean_name(name)[0])
+        killed, _, killer = lines[0][1][:3]
+        first = lines.offsets[0]
+        self.assertEqual(cleaned[ids[lines.fields[first]]], clean_name(killed)[0])
+        self.assertEqual(cleaned[ids[lines.fields[first + 2]]], clean_name(killer)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+from datetime import datetime, timedelta
+import json
+import unittest
+
+from events import (
+    ActorDeath,
+    ContextEstablisherTask,
+    EVENT_CLASSES,
+    Event,
+    Incap,
+    Loaded,
+    Spawn,
+    VehicleDestruction,
+    field_names,
+    make_event,
+)
+from log_parser import SCLogParser
+from main import JsonRenderer, Renderer, RENDERER
+import test_log_parser
+
+TIMESTAMP = datetime(2024, 12, 23)
+
+
+class TestEvents(unittest.TestCase):
+    def setUp(self):
+        self.events = [
+            event
+            for event in map(SCLogParser.parse_event, test_log_parser.TestBytes.LINES)
+            if event
+        ]
+
+    def test_every_event_type(self):
+        self.assertEqual(set(EVENT_CLASSES), set(SCLogParser.PATTERNS))
+        for event_type, cls in EVENT_CLASSES.items():
+            self.assertEqual(cls.event_type, event_type)
+
+    def test_parse_event(self):
+        self.assertEqual(
+            [type(event) for event in self.events],
+            [ActorDeath, VehicleDestruction, Incap, Loaded, Spawn],
+        )
+        self.assertIsNone(SCLogParser.parse_event("Log started"))
+
+    def test_fields(self):
+        kill, vehicle, incap, loaded, _ = self.events
+        self.assertEqual(kill.killer, "Player-123_Name")
+        self.assertEqual(kill.weapon, "GATS_BallisticGatling_Mounted_S1")
+        self.assertEqual(vehicle.destroy_level, 2)
+        self.assertEqual(vehicle.driver, "unknown")
+        self.assertEqual(
+            incap.causes,
+            (("DepressurizationDamage", 3.999999), ("SuffocationDamage", 1.999999)),
+        )
+        self.assertEqual(loaded.item, "pu")
+        self.assertEqual(loaded.load_time, 52.13)
+        self.assertEqual(kill.timestamp, datetime(2024, 12, 23))
+
+    def test_cet(self):
+        event = make_event(
+            "CET",
+            ("ContextEstablisherTaskFinished", "task", "InGame", "15", "42.5"),
+            TIMESTAMP,
+        )
+        self.assertEqual(
+            event, ContextEstablisherTask(TIMESTAMP, True, "task", "InGame", 15, 42.5)
+        )
+
+    def test_field_names(self):
+        self.assertEqual(field_names(Spawn), ())
+        self.assertEqual(field_names(Loaded), ("item", "load_time"))
+        self.assertEqual(
+            field_names(VehicleDestruction),
+            ("vehicle", "zone", "driver", "destroy_level", "killer", "damage_type"),
+        )
+
+    def test_slots(self):
+        for event in self.events:
+            with self.assertRaises(AttributeError):
+                event.extra = 1
+            self.assertFalse(hasattr(event, "__dict__"))
+
+
+class TestRenderer(unittest.TestCase):
+    def test_same_as_format(self):
+        for line in test_log_parser.TestBytes.LINES:
+            if match := SCLogParser.find_match(line):
+                self.assertEqual(
+                    RENDERER.render(SCLogParser.parse_event(line)),
+                    RENDERER.format(match[0], match[1].groups(), match[2]),
+                )
+
+    def test_unrendered(self):
+        self.assertIsNone(Renderer().render(Spawn(TIMESTAMP)))
+        self.assertIsNone(RENDERER.render(Event(TIMESTAMP)))
+
+    def test_subclass(self):
+        class KillsOnly(Renderer):
+            def killp(self, event):
+                return f"{event.killer} -> {event.killed}"
+
+        lines = [
+            KillsOnly().render(event)
+            for event in map(SCLogParser.parse_event, test_log_parser.TestBytes.LINES)
+            if event
+        ]
+        self.assertEqual(
+            lines,
+            [
+                "Player-123_Name -> PU_Human-NineTails-Grunt-Male-Grunt_10_123456789012",
+                None,
+                None,
+                None,
+                None,
+            ],
+        )
+
+
+class TestJsonRenderer(unittest.TestCase):
+    def setUp(self):
+        self.events = [
+            event
+            for event in map(SCLogParser.parse_event, test_log_parser.TestBytes.LINES)
+            if event
+        ]
+        self.records = [json.loads(JsonRenderer().render(e)) for e in self.events]
+
+    def test_every_event(self):
+        self.assertEqual(
+            [record["event"] for record in self.records],
+            ["KILLP", "KILLV", "INCAP", "LOADED", "SPAWN"],
+        )
+        for event in self.events:
+            line = JsonRenderer().render(event)
+            self.assertNotIn("\n", line)
+            self.assertNotIn("\x1b", line)
+
+    def test_fields(self):
+        kill, vehicle, incap, loaded, spawn = self.records
+        self.assertEqual(kill["timestamp"], "2024-12-23T00:00:00.000+00:00")
+        self.assertEqual(kill["fields"]["killer"], "Player-123_Name")
+        self.assertEqual(vehicle["fields"]["destroy_level"], 2)
+        self.assertEqual(
+            incap["fields"]["causes"],
+            [["DepressurizationDamage", 3.999999], ["SuffocationDamage", 1.999999]],
+        )
+        self.assertEqual(loaded["fields"], {"item": "pu", "load_time": 52.13})
+        self.assertEqual(spawn["fields"], {})
+        self.assertEqual(spawn["cleaned"], {})
+
+    def test_milliseconds(self):
+        kill, vehicle, *_ = self.records
+        self.assertEqual(kill["timestamp"], "2024-12-23T00:00:00.000+00:00")
+        self.assertEqual(vehicle["timestamp"], "2024-12-23T00:00:01.002+00:00")
+        self.assertEqual(
+            {len(record["timestamp"]) for record in self.records},
+            {len("2024-12-23T00:00:00.000+00:00")},
+        )
+
+    def test_utc(self):
+        for record in self.records:
+            timestamp = datetime.fromisoformat(record["timestamp"])
+            self.assertEqual(timestamp.utcoffset(), timedelta(0))
+
+    def test_cleaned(self):
+        kill, vehicle, incap, loaded, _ = self.records
+        self.assertEqual(kill["cleaned"]["killed"], "NineTails_Grunt_Male_Grunt")
+        self.assertTrue(kill["cleaned"]["killed_npc"])
+        self.assertFalse(kill["cleaned"]["killer_npc"])
+        self.assertEqual(
+            kill["cleaned"]["weapon"], "Mounted YellowJacket GT-210 Gatling"
+        )
+        self.assertEqual(vehicle["cleaned"]["vehicle"], "Mirai Guardian QI")
+        self.assertIsNone(vehicle["cleaned"]["driver"])
+        self.assertTrue(vehicle["cleaned"]["destroyed"])
+        self.assertEqual(
+            incap["cleaned"]["causes"], ["Depressurization", "Suffocation"]
+        )
+        self.assertEqual(loaded["cleaned"]["item"], "PU")
+
+    def test_install(self):
+        self.assertNotIn("install", self.records[0])
+        record = json.loads(JsonRenderer("PTU").render(self.events[0]))
+        self.assertEqual(record["install"], "PTU")
+
+    def test_format(self):
+        for line in test_log_parser.TestBytes.LINES:
+            if match := SCLogParser.find_match(line):
+                self.assertEqual(
+                    JsonRenderer().format(match[0], match[1].groups(), match[2]),
+                    JsonRenderer().render(SCLogParser.parse_event(line)),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
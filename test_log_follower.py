@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+import asyncio
+import glob
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from log_follower import (
+    Follower,
+    InotifyWatcher,
+    MAX_DELAY,
+    MIN_DELAY,
+    PollWatcher,
+    follow,
+    watch,
+)
+from log_parser import LOG_ENCODING, LOG_NEWLINE
+
+
+class FollowTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.log = tempfile.mkstemp(suffix=".log")
+        self.writer = os.fdopen(fd, "w", encoding=LOG_ENCODING, newline="")
+        self.reader = open(self.log, "rb")
+
+    def tearDown(self):
+        self.writer.close()
+        self.reader.close()
+        for path in [self.log, *self.backups]:
+            os.remove(path)
+
+    @property
+    def backups(self):
+        return glob.glob(glob.escape(self.log) + ".*.bak")
+
+    def rotate(self):
+        """Moves the log away and starts a new one, like the game does."""
+        os.replace(self.log, f"{self.log}.{len(self.backups)}.bak")
+        old, self.writer = self.writer, open(
+            self.log, "w", encoding=LOG_ENCODING, newline=""
+        )
+        return old
+
+    def write(self, text, delay=0.0):
+        def write():
+            time.sleep(delay)
+            self.writer.write(text)
+            self.writer.flush()
+
+        if not delay:
+            return write()
+        thread = threading.Thread(target=write)
+        thread.start()
+        self.addCleanup(thread.join)
+
+
+class TestPollWatcher(unittest.TestCase):
+    def test_backoff(self):
+        watcher = PollWatcher()
+        with mock.patch("time.sleep") as sleep:
+            for _ in range(12):
+                watcher.wait()
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(delays[0], MIN_DELAY)
+        self.assertEqual(delays[1], MIN_DELAY * 2)
+        self.assertEqual(delays, sorted(delays))
+        self.assertLessEqual(max(delays), MAX_DELAY)
+        # Reached after log2(MAX_DELAY / MIN_DELAY) doublings, and stays there
+        self.assertEqual(delays[-3:], [MAX_DELAY] * 3)
+
+    def test_reset(self):
+        watcher = PollWatcher()
+        watcher.wait()
+        self.assertEqual(watcher.delay, MIN_DELAY * 2)
+        watcher.reset()
+        self.assertEqual(watcher.delay, MIN_DELAY)
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+class TestInotifyWatcher(FollowTestCase):
+    def test_wakes_on_write(self):
+        watcher = InotifyWatcher(self.log)
+        self.addCleanup(watcher.close)
+        self.write("line" + LOG_NEWLINE, delay=0.05)
+        start = time.perf_counter()
+        watcher.wait()
+        self.assertLess(time.perf_counter() - start, MAX_DELAY / 2)
+
+    def test_watch(self):
+        watcher = watch(self.log)
+        self.addCleanup(watcher.close)
+        self.assertIsInstance(watcher, InotifyWatcher)
+
+    def test_wakes_on_create(self):
+        watcher = InotifyWatcher(self.log + ".new")
+        self.addCleanup(watcher.close)
+        self.addCleanup(os.remove, self.log + ".new")
+        thread = threading.Timer(0.05, lambda: open(self.log + ".new", "w").close())
+        thread.start()
+        self.addCleanup(thread.join)
+        start = time.perf_counter()
+        watcher.wait()
+        self.assertLess(time.perf_counter() - start, MAX_DELAY / 2)
+
+    def test_missing_directory(self):
+        with self.assertRaises(OSError):
+            InotifyWatcher(os.path.join(self.log + ".missing", "Game.log"))
+
+
+class TestFollow(FollowTestCase):
+    def test_existing_then_new_lines(self):
+        self.write("one" + LOG_NEWLINE + "two" + LOG_NEWLINE)
+        lines = follow(self.reader)
+        self.assertEqual(next(lines), "one" + LOG_NEWLINE)
+        self.assertEqual(next(lines), "two" + LOG_NEWLINE)
+        self.write("three" + LOG_NEWLINE, delay=0.05)
+        self.assertEqual(next(lines), "three" + LOG_NEWLINE)
+        lines.close()
+
+    def test_poll_watcher(self):
+        lines = follow(self.reader, PollWatcher())
+        self.write("one" + LOG_NEWLINE, delay=0.05)
+        self.assertEqual(next(lines), "one" + LOG_NEWLINE)
+        lines.close()
+
+    def test_on_idle(self):
+        self.write("one" + LOG_NEWLINE + "two" + LOG_NEWLINE)
+        idle = []
+        lines = iter(
+            Follower(self.reader, PollWatcher(), on_idle=lambda: idle.append(True))
+        )
+        self.assertEqual(next(lines), "one" + LOG_NEWLINE)
+        self.assertEqual(next(lines), "two" + LOG_NEWLINE)
+        self.assertEqual(idle, [])
+        self.write("three" + LOG_NEWLINE, delay=0.05)
+        self.assertEqual(next(lines), "three" + LOG_NEWLINE)
+        self.assertTrue(idle)
+        lines.close()
+
+    def test_offset(self):
+        self.write("one" + LOG_NEWLINE + "two" + LOG_NEWLINE)
+        self.reader.readline()
+        follower = Follower(self.reader, PollWatcher())
+        self.assertEqual(follower.offset, 5)
+        lines = iter(follower)
+        self.assertEqual(next(lines), "two" + LOG_NEWLINE)
+        self.assertEqual(follower.offset, 10)
+        lines.close()
+
+
+class TestAsync(FollowTestCase):
+    async def read(self, follower, count):
+        lines = []
+        async for line in follower:
+            lines.append(line)
+            if len(lines) == count:
+                break
+        return lines
+
+    def test_poll_watcher(self):
+        self.write("one" + LOG_NEWLINE)
+        self.write("two" + LOG_NEWLINE, delay=0.05)
+        follower = Follower(self.reader, PollWatcher())
+        lines = asyncio.run(self.read(follower, 2))
+        self.assertEqual(lines, ["one" + LOG_NEWLINE, "two" + LOG_NEWLINE])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_watcher(self):
+        self.write("one" + LOG_NEWLINE, delay=0.05)
+        follower = Follower(self.reader, InotifyWatcher(self.log))
+        start = time.perf_counter()
+        lines = asyncio.run(self.read(follower, 1))
+        self.assertEqual(lines, ["one" + LOG_NEWLINE])
+        self.assertLess(time.perf_counter() - start, MAX_DELAY / 2)
+
+    def test_concurrent(self):
+        fd, other = tempfile.mkstemp(suffix=".log")
+        self.addCleanup(os.remove, other)
+        with os.fdopen(fd, "w", encoding=LOG_ENCODING, newline="") as f:
+            f.write("two" + LOG_NEWLINE)
+        self.write("one" + LOG_NEWLINE, delay=0.05)
+
+        async def read_both():
+            with open(other, "rb") as f:
+                return await asyncio.gather(
+                    self.read(Follower(self.reader, PollWatcher()), 1),
+                    self.read(Follower(f, PollWatcher()), 1),
+                )
+
+        self.assertEqual(
+            asyncio.run(read_both()), [["one" + LOG_NEWLINE], ["two" + LOG_NEWLINE]]
+        )
+
+
+class TestTornWrites(FollowTestCase):
+    def test_partial_line_held_back(self):
+        follower = Follower(self.reader, PollWatcher())
+        self.write("one" + LOG_NEWLINE + "tw")
+        self.assertEqual(list(follower.poll()), ["one" + LOG_NEWLINE])
+        self.assertEqual(follower.offset, 5)
+        self.write("o")
+        self.assertEqual(list(follower.poll()), [])
+        self.write("\r")
+        self.assertEqual(list(follower.poll()), [])
+        self.write("\n")
+        self.assertEqual(list(follower.poll()), ["two" + LOG_NEWLINE])
+        self.assertEqual(follower.offset, 10)
+        follower.close()
+
+    def test_block_boundaries(self):
+        # Every line is split across blocks somewhere, including between
+        # the \r and the \n
+        lines = [f"{i:0{i % 7 + 1}}" + LOG_NEWLINE for i in range(500)]
+        self.write("".join(lines))
+        with mock.patch("log_follower.BLOCK_SIZE", 5):
+            follower = Follower(self.reader, PollWatcher())
+            self.assertEqual(list(follower.poll()), lines)
+        follower.close()
+
+    def test_torn_writes(self):
+        lines = [f"<{i}> {'x' * (i % 97)}" + LOG_NEWLINE for i in range(2000)]
+        data = "".join(lines)
+
+        def write():
+            rng = random.Random(0)
+            pos = 0
+            while pos < len(data):
+                end = pos + rng.randint(1, 200)
+                self.writer.write(data[pos:end])
+                self.writer.flush()
+                pos = end
+                if rng.random() < 0.05:
+                    time.sleep(0.001)
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        self.addCleanup(thread.join)
+        lines_read = follow(self.reader, PollWatcher())
+        self.assertEqual([next(lines_read) for _ in lines], lines)
+        lines_read.close()
+
+    def test_offset_mid_block(self):
+        self.write("one" + LOG_NEWLINE + "two" + LOG_NEWLINE + "three")
+        follower = Follower(self.reader, PollWatcher())
+        lines = follower.poll()
+        next(lines)
+        self.assertEqual(follower.offset, 5)
+        next(lines)
+        self.assertEqual(follower.offset, 10)
+        self.assertEqual(list(lines), [])
+        self.assertEqual(follower.offset, 10)
+        follower.close()
+
+
+class TestRotation(FollowTestCase):
+    def test_rotation(self):
+        self.write("one" + LOG_NEWLINE)
+        lines = follow(self.reader, PollWatcher())
+        self.assertEqual(next(lines), "one" + LOG_NEWLINE)
+        old = self.rotate()
+        # Written to the old file after it was moved
+        old.write("two" + LOG_NEWLINE)
+        old.close()
+        self.write("three" + LOG_NEWLINE)
+        self.assertEqual(next(lines), "two" + LOG_NEWLINE)
+        self.assertEqual(next(lines), "three" + LOG_NEWLINE)
+        self.write("four" + LOG_NEWLINE, delay=0.05)
+        self.assertEqual(next(lines), "four" + LOG_NEWLINE)
+        lines.close()
+        self.assertFalse(self.reader.closed)
+
+    def test_new_file_later(self):
+        lines = follow(self.reader, PollWatcher())
+        os.replace(self.log, self.log + ".0.bak")
+        timer = threading.Timer(0.05, self.rotate_later)
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertEqual(next(lines), "one" + LOG_NEWLINE)
+        lines.close()
+
+    def rotate_later(self):
+        self.writer.close()
+        self.writer = open(self.log, "w", encoding=LOG_ENCODING, newline="")
+        self.write("one" + LOG_NEWLINE)
+
+    def test_truncation(self):
+        self.write("one" + LOG_NEWLINE + "two" + LOG_NEWLINE)
+        lines = follow(self.reader, PollWatcher())
+        self.assertEqual(next(lines), "one" + LOG_NEWLINE)
+        self.assertEqual(next(lines), "two" + LOG_NEWLINE)
+        self.writer.seek(0)
+        self.writer.truncate()
+        self.write("3" + LOG_NEWLINE)
+        self.assertEqual(next(lines), "3" + LOG_NEWLINE)
+        lines.close()
+
+    def test_double_rotation(self):
+        self.write("one" + LOG_NEWLINE)
+        follower = Follower(self.reader, PollWatcher())
+        self.assertEqual(list(follower.poll()), ["one" + LOG_NEWLINE])
+        self.rotate().close()
+        self.write("two" + LOG_NEWLINE)
+        self.rotate().close()
+        self.write("three" + LOG_NEWLINE)
+        # Replaced again before the first replacement was noticed, so the file
+        # in between is never opened and its lines are missed (see Follower)
+        self.assertEqual(list(follower.poll()), ["three" + LOG_NEWLINE])
+        follower.close()
+
+    def test_rotation_while_writing(self):
+        count, every = 2000, 100
+
+        def write():
+            for i in range(count):
+                if i and i % every == 0:
+                    # Without waiting for the reader, unlike test_rapid_rotation
+                    self.writer.flush()
+                    self.rotate().close()
+                self.writer.write(f"{i}{LOG_NEWLINE}")
+                if i % 10 == 0:
+                    self.writer.flush()
+                    time.sleep(0.001)
+            self.writer.write("end" + LOG_NEWLINE)
+            self.writer.flush()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        self.addCleanup(thread.join)
+        lines = follow(self.reader, PollWatcher())
+        numbers = [int(line) for line in iter(lines.__next__, "end" + LOG_NEWLINE)]
+        lines.close()
+        # In order and never twice, and only whole files may be missed
+        self.assertEqual(numbers, sorted(set(numbers)))
+        files = {i // every for i in numbers}
+        self.assertEqual(numbers, [i for i in range(count) if i // every in files])
+        self.assertIn((count - 1) // every, files)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_rapid_rotation(self):
+        count, every = 2000, 200
+        read = []
+
+        def write():
+            for i in range(count):
+                if i and i % every == 0:
+                    # A file replaced again before the last replacement was
+                    # noticed is missed (see Follower), so wait until it was
+                    # read from, however slowly the reader is scheduled
+                    self.writer.flush()
+                    deadline = time.monotonic() + 10
+                    while len(read) < i and time.monotonic() < deadline:
+                        time.sleep(0.001)
+                    self.rotate().close()
+                self.writer.write(f"{i}{LOG_NEWLINE}")
+                if i % 10 == 0:
+                    self.writer.flush()
+                    time.sleep(0.001)
+            self.writer.flush()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        self.addCleanup(thread.join)
+        lines = follow(self.reader, InotifyWatcher(self.log))
+        for _ in range(count):
+            read.append(next(lines))
+        self.assertEqual(read, [f"{i}{LOG_NEWLINE}" for i in range(count)])
+        lines.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
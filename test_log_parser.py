@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
+from datetime import datetime
 import unittest
 
-from main import LOG_INCAP_CAUSE
-from log_parser import SCLogParser
+from events import LOG_INCAP_CAUSE
+from log_parser import LOG_ENCODING, LOG_NEWLINE, SCLogParser
 
 
 class TestLogKillRegex(unittest.TestCase):
@@ -13,16 +14,17 @@ class TestLogKillRegex(unittest.TestCase):
         self.assertIsNotNone(match)
         self.assertEqual(match[0], "KILLP")
         result = match[1]
-        self.assertEqual(len(result.groups()), 7)
-        self.assertEqual(result[1], "2024-12-23T00:00:00")
+        timestamp = match[2]
+        self.assertEqual(len(result.groups()), 6)
+        self.assertEqual(timestamp, datetime.fromisoformat("2024-12-23T00:00:00"))
         self.assertEqual(
-            result[2], "PU_Human-NineTails-Grunt-Male-Grunt_10_123456789012"
+            result[1], "PU_Human-NineTails-Grunt-Male-Grunt_10_123456789012"
         )
-        self.assertEqual(result[3], "OOC_Stanton_3a_Lyria")
-        self.assertEqual(result[4], "Player-123_Name")
-        self.assertEqual(result[5], "GATS_BallisticGatling_Mounted_S1")
-        self.assertEqual(result[6], "Bullet")
-        self.assertEqual(result[7], "x: -0.123456, y: -0.123456, z: 0.123456")
+        self.assertEqual(result[2], "OOC_Stanton_3a_Lyria")
+        self.assertEqual(result[3], "Player-123_Name")
+        self.assertEqual(result[4], "GATS_BallisticGatling_Mounted_S1")
+        self.assertEqual(result[5], "Bullet")
+        self.assertEqual(result[6], "x: -0.123456, y: -0.123456, z: 0.123456")
 
 
 class TestLogVKillRegex(unittest.TestCase):
@@ -33,14 +35,15 @@ class TestLogVKillRegex(unittest.TestCase):
         self.assertIsNotNone(match)
         self.assertEqual(match[0], "KILLV")
         result = match[1]
-        self.assertEqual(len(result.groups()), 7)
-        self.assertEqual(result[1], "2024-12-23T00:00:00")
-        self.assertEqual(result[2], "MRAI_Guardian_QI_123456789012")
-        self.assertEqual(result[3], "OOC_Stanton_3a_Lyria")
-        self.assertEqual(result[4], "unknown")
-        self.assertEqual(result[5], "2")
-        self.assertEqual(result[6], "Player-123_Name")
-        self.assertEqual(result[7], "Combat")
+        timestamp = match[2]
+        self.assertEqual(len(result.groups()), 6)
+        self.assertEqual(timestamp, datetime.fromisoformat("2024-12-23T00:00:00"))
+        self.assertEqual(result[1], "MRAI_Guardian_QI_123456789012")
+        self.assertEqual(result[2], "OOC_Stanton_3a_Lyria")
+        self.assertEqual(result[3], "unknown")
+        self.assertEqual(result[4], "2")
+        self.assertEqual(result[5], "Player-123_Name")
+        self.assertEqual(result[6], "Combat")
 
 
 class TestLogRespawnRegex(unittest.TestCase):
@@ -51,10 +54,11 @@ class TestLogRespawnRegex(unittest.TestCase):
         self.assertIsNotNone(match)
         self.assertEqual(match[0], "RESPAWN")
         result = match[1]
-        self.assertEqual(len(result.groups()), 3)
-        self.assertEqual(result[1], "2024-12-23T00:00:00")
-        self.assertEqual(result[2], "Player-123_Name")
-        self.assertEqual(result[3], "@Stanton1b_Aberdeen_Prison")
+        timestamp = match[2]
+        self.assertEqual(len(result.groups()), 2)
+        self.assertEqual(timestamp, datetime.fromisoformat("2024-12-23T00:00:00"))
+        self.assertEqual(result[1], "Player-123_Name")
+        self.assertEqual(result[2], "@Stanton1b_Aberdeen_Prison")
 
 
 class TestLogIncapRegexSingleCause(unittest.TestCase):
@@ -65,13 +69,14 @@ class TestLogIncapRegexSingleCause(unittest.TestCase):
         self.assertIsNotNone(match)
         self.assertEqual(match[0], "INCAP")
         self.result = match[1]
-        self.cause = LOG_INCAP_CAUSE.findall(self.result[3])
+        self.timestamp = match[2]
+        self.cause = LOG_INCAP_CAUSE.findall(self.result[2])
 
     def test_incap(self):
-        self.assertEqual(len(self.result.groups()), 3)
-        self.assertEqual(self.result[1], "2024-12-18T00:00:00")
-        self.assertEqual(self.result[2], "Player-123_Name")
-        self.assertEqual(self.result[3], "Bleed (0.350000 damage)")
+        self.assertEqual(len(self.result.groups()), 2)
+        self.assertEqual(self.timestamp, datetime.fromisoformat("2024-12-18T00:00:00"))
+        self.assertEqual(self.result[1], "Player-123_Name")
+        self.assertEqual(self.result[2], "Bleed (0.350000 damage)")
 
     def test_incap_cause(self):
         self.assertEqual(self.cause[0][0], "Bleed")
@@ -86,14 +91,15 @@ class TestLogIncapRegexMultipleCause(unittest.TestCase):
         self.assertIsNotNone(match)
         self.assertEqual(match[0], "INCAP")
         self.result = match[1]
-        self.cause = LOG_INCAP_CAUSE.findall(self.result[3])
+        self.timestamp = match[2]
+        self.cause = LOG_INCAP_CAUSE.findall(self.result[2])
 
     def test_incap(self):
-        self.assertEqual(len(self.result.groups()), 3)
-        self.assertEqual(self.result[1], "2024-12-22T00:00:00")
-        self.assertEqual(self.result[2], "Player-123_Name")
+        self.assertEqual(len(self.result.groups()), 2)
+        self.assertEqual(self.timestamp, datetime.fromisoformat("2024-12-22T00:00:00"))
+        self.assertEqual(self.result[1], "Player-123_Name")
         self.assertEqual(
-            self.result[3],
+            self.result[2],
             "DepressurizationDamage (3.999999 damage), SuffocationDamage (1.999999 damage)",
         )
 
@@ -104,5 +110,169 @@ class TestLogIncapRegexMultipleCause(unittest.TestCase):
         self.assertEqual(self.cause[1][1], "1.999999")
 
 
+class TestDispatch(unittest.TestCase):
+    def test_get_tag_notice(self):
+        tag = SCLogParser.get_tag(
+            "<2024-12-23T00:00:00.000Z> [Notice] <Actor Death> CActor::Kill: 'x'"
+        )
+        self.assertEqual(tag, "<Actor Death>")
+
+    def test_get_tag_bracketed(self):
+        tag = SCLogParser.get_tag(
+            "<2024-12-23T00:00:00.000Z> [CSessionManager::OnClientSpawned] Spawned!"
+        )
+        self.assertEqual(tag, "[CSessionManager::OnClientSpawned]")
+
+    def test_get_tag_nested(self):
+        tag = SCLogParser.get_tag(
+            "<2024-12-23T00:00:00.000Z> [Notice] <[EALobby] EALobbyQuit> [EALobby]"
+        )
+        self.assertEqual(tag, "<[EALobby] EALobbyQuit>")
+
+    def test_get_tag_word(self):
+        tag = SCLogParser.get_tag(
+            "<2024-12-23T00:00:00.000Z> Loading screen for pu : SC_Frontend closed"
+        )
+        self.assertEqual(tag, "Loading")
+
+    def test_get_tag_short(self):
+        self.assertEqual(SCLogParser.get_tag("Log started\r\n"), "")
+        self.assertEqual(SCLogParser.get_tag(""), "")
+
+    def test_unknown_tag(self):
+        self.assertIsNone(
+            SCLogParser.find_match(
+                "<2024-12-23T00:00:00.000Z> [Notice] <Actor stall> Actor stall detected"
+            )
+        )
+
+    def test_known_tag_no_match(self):
+        self.assertIsNone(
+            SCLogParser.find_match(
+                "<2024-12-23T00:00:00.000Z> Loading object container ObjectContainer"
+            )
+        )
+
+    def test_every_pattern_has_a_tag(self):
+        self.assertEqual(set(SCLogParser.TAGS.values()), set(SCLogParser.PATTERNS))
+
+
+class TestTimestamp(unittest.TestCase):
+    def test_milliseconds(self):
+        timestamp = SCLogParser.parse_timestamp(
+            "<2024-12-23T01:02:03.456Z> [Notice] <Actor Death> CActor::Kill"
+        )
+        self.assertEqual(timestamp, datetime(2024, 12, 23, 1, 2, 3, 456000))
+
+    def test_same_second_is_cached(self):
+        SCLogParser.parse_timestamp("<2024-12-23T01:02:03.000Z> a")
+        cached = SCLogParser._last_time
+        timestamp = SCLogParser.parse_timestamp("<2024-12-23T01:02:03.999Z> b")
+        self.assertIs(SCLogParser._last_time, cached)
+        self.assertEqual(timestamp.microsecond, 999000)
+
+    def test_invalid(self):
+        for line in [
+            "",
+            "Log started on Mon Dec 23 00:00:00 2024",
+            "<2024-12-23 01:02:03.000Z> a",
+            "<2024-12-23T01:02:03.abcZ> a",
+            "<2024-13-23T01:02:03.000Z> a",
+            "<2024-12-23T00:00:00.\u00b2\u00b2\u00b2Z> a",
+        ]:
+            self.assertIsNone(SCLogParser.parse_timestamp(line), line)
+
+    def test_superscript_milliseconds(self):
+        line = (
+            "<2024-12-23T00:00:00.\u00b2\u00b2\u00b2Z> Loading screen for pu :"
+            " SC_Frontend closed after 52.13 seconds"
+        )
+        self.assertIsNone(SCLogParser.find_match(line))
+
+
+class TestBytes(unittest.TestCase):
+    LINES = [
+        "<2024-12-23T00:00:00.000Z> [Notice] <Actor Death> CActor::Kill: 'PU_Human-NineTails-Grunt-Male-Grunt_10_123456789012' [123456789012] in zone 'OOC_Stanton_3a_Lyria' killed by 'Player-123_Name' [123456789012] using 'GATS_BallisticGatling_Mounted_S1_123456789012' [Class GATS_BallisticGatling_Mounted_S1] with damage type 'Bullet' from direction x: -0.123456, y: -0.123456, z: 0.123456 [Team_ActorTech][Actor]",
+        "<2024-12-23T00:00:00.001Z> [Notice] <Actor stall> Actor stall detected, Player: Player-123_Name, Type: downstream, Length: 1.042381. [Team_ActorTech][Actor]",
+        "<2024-12-23T00:00:01.002Z> [Notice] <Vehicle Destruction> CVehicle::OnAdvanceDestroyLevel: Vehicle 'MRAI_Guardian_QI_123456789012' [123456789012] in zone 'OOC_Stanton_3a_Lyria' [pos x: -200000.000000, y: 100000.000000, z: 60000.000000 vel x: 0.000000, y: 0.000000, z: 0.000000] driven by 'unknown' [0] advanced from destroy level 1 to 2 caused by 'Player-123_Name' [123456789012] with 'Combat' [Team_VehicleFeatures][Vehicle]",
+        "Log started on Mon Dec 23 00:00:00 2024",
+        "<2024-12-23T00:00:02.003Z> Logged an incap.! nickname: Player-123_Name, causes: [DepressurizationDamage (3.999999 damage), SuffocationDamage (1.999999 damage)]",
+        "<2024-12-23T00:00:02.004Z> Loading object container ObjectContainer-ugf_lta_a_0003",
+        "<2024-12-23T00:00:03.005Z> Loading screen for pu : SC_Frontend closed after 52.13 seconds",
+        "<2024-12-23T00:00:03.006Z> [CSessionManager::OnClientSpawned] Spawned!",
+    ]
+
+    @staticmethod
+    def text_event(line):
+        if match := SCLogParser.find_match(line):
+            return (match[0], match[1].groups(), match[2])
+        return None
+
+    def test_same_as_text(self):
+        for line in self.LINES:
+            self.assertEqual(
+                SCLogParser.match_bytes(line.encode(LOG_ENCODING)),
+                self.text_event(line),
+                line,
+            )
+
+    def test_iter_bytes(self):
+        buf = (LOG_NEWLINE.join(self.LINES) + LOG_NEWLINE).encode(LOG_ENCODING)
+        events = list(SCLogParser.iter_bytes(buf))
+        expected = [e for e in map(self.text_event, self.LINES) if e]
+        self.assertEqual(len(events), 5)
+        self.assertEqual(events, expected)
+
+    def test_iter_bytes_partial_line(self):
+        complete = (self.LINES[0] + LOG_NEWLINE).encode(LOG_ENCODING)
+        buf = complete + self.LINES[2][:50].encode(LOG_ENCODING)
+        events = SCLogParser.iter_bytes(buf)
+        self.assertEqual(next(events)[0], "KILLP")
+        with self.assertRaises(StopIteration) as stop:
+            next(events)
+        self.assertEqual(stop.exception.value, len(complete))
+
+
+class TestParseLines(unittest.TestCase):
+    def setUp(self):
+        self.expected = [e for e in map(TestBytes.text_event, TestBytes.LINES) if e]
+
+    def test_text(self):
+        result = SCLogParser.parse_lines(TestBytes.LINES)
+        self.assertEqual(len(result), 5)
+        self.assertEqual(list(result), self.expected)
+
+    def test_buffer(self):
+        buf = LOG_NEWLINE.join(TestBytes.LINES).encode(LOG_ENCODING)
+        result = SCLogParser.parse_lines(buf)
+        self.assertEqual(list(result), self.expected)
+        self.assertEqual(result[-1], self.expected[-1])
+
+    def test_columns(self):
+        result = SCLogParser.parse_lines(TestBytes.LINES)
+        self.assertEqual(
+            [SCLogParser.EVENT_TYPES[code] for code in result.types],
+            ["KILLP", "KILLV", "INCAP", "LOADED", "SPAWN"],
+        )
+        self.assertEqual(result.offsets.tolist(), [0, 6, 12, 14, 16, 16])
+        self.assertEqual(result.strings.count("Player-123_Name"), 1)
+        self.assertEqual(result.strings.count("OOC_Stanton_3a_Lyria"), 1)
+
+
+class TestStats(unittest.TestCase):
+    def test_hits_and_misses(self):
+        hits = SCLogParser.hits["LOADED"]
+        misses = SCLogParser.misses["LOADED"]
+        SCLogParser.find_match(
+            "<2024-12-23T00:00:00.000Z> Loading screen for pu : SC_Frontend closed after 52.13 seconds"
+        )
+        SCLogParser.match_bytes(
+            b"<2024-12-23T00:00:00.000Z> Loading object container ObjectContainer"
+        )
+        SCLogParser.find_match("<2024-12-23T00:00:00.000Z> Unknown line")
+        self.assertEqual(SCLogParser.hits["LOADED"], hits + 1)
+        self.assertEqual(SCLogParser.misses["LOADED"], misses + 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+import bz2
+from collections import Counter
+import gzip
+import lzma
+import os
+import tempfile
+import unittest
+
+from log_parser import LOG_ENCODING, LOG_NEWLINE, SCLogParser
+from log_reader import (
+    add_stats,
+    get_opener,
+    get_stats,
+    iter_mmap,
+    iter_stream,
+    scan,
+    scan_parallel,
+    split_ranges,
+    stats_since,
+    tail,
+)
+from main import clean_name
+import test_log_parser
+
+
+def keep_fields(event_type, fields, timestamp):
+    return fields
+
+
+def drop_all(event_type, fields, timestamp):
+    return None
+
+
+class LogFileTestCase(unittest.TestCase):
+    # The sample lines again and again, with timestamps that keep increasing
+    LINES = [
+        f"<2024-12-23T{i // 3600:02}:{i // 60 % 60:02}:{i % 60:02}.000Z>{line[26:]}"
+        for i, line in enumerate(test_log_parser.TestBytes.LINES * 50)
+    ]
+
+    def setUp(self):
+        fd, self.log = tempfile.mkstemp(suffix=".log")
+        with os.fdopen(fd, "w", encoding=LOG_ENCODING, newline="") as f:
+            f.write(LOG_NEWLINE.join(self.LINES) + LOG_NEWLINE)
+        self.expected = [
+            (match[2], match[0], match[1].groups())
+            for match in map(SCLogParser.find_match, self.LINES)
+            if match
+        ]
+
+    def tearDown(self):
+        os.remove(self.log)
+
+
+class TestSplitRanges(LogFileTestCase):
+    def test_line_boundaries(self):
+        with open(self.log, "rb") as f:
+            data = f.read()
+        ranges = split_ranges(self.log, 7)
+        self.assertEqual(len(ranges), 7)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 2 : end], b"\r\n")
+
+    def test_more_ranges_than_lines(self):
+        ranges = split_ranges(self.log, len(self.LINES) * 2)
+        self.assertEqual(len(ranges), len(self.LINES))
+
+
+class TestScan(LogFileTestCase):
+    def test_iter_mmap(self):
+        result = [(e[2], e[0], e[1]) for e in iter_mmap(self.log)]
+        self.assertEqual(result, self.expected)
+
+    def test_iter_mmap_range(self):
+        start, end = split_ranges(self.log, 3)[1]
+        with open(self.log, "rb") as f:
+            f.seek(start)
+            expected = list(SCLogParser.iter_buffer(f.read(end - start)))
+        self.assertEqual(list(iter_mmap(self.log, start, end)), expected)
+
+    def test_empty(self):
+        with open(self.log, "w"):
+            pass
+        self.assertEqual(list(iter_mmap(self.log)), [])
+
+    def test_scan(self):
+        self.assertEqual(list(scan(self.log, keep_fields)), self.expected)
+
+
+class TestScanParallel(LogFileTestCase):
+    def test_single_worker(self):
+        result = list(scan_parallel(self.log, keep_fields, 1))
+        self.assertEqual(result, self.expected)
+
+    def test_workers(self):
+        result = list(scan_parallel(self.log, keep_fields, 3))
+        self.assertEqual(result, self.expected)
+
+    def test_dropped(self):
+        self.assertEqual(list(scan_parallel(self.log, drop_all, 1)), [])
+
+    def test_stats(self):
+        before = get_stats()
+        list(scan_parallel(self.log, keep_fields, 1))
+        single = stats_since(before)
+        self.assertEqual(single[0]["KILLP"], 50)
+        before = get_stats()
+        list(scan_parallel(self.log, keep_fields, 3))
+        self.assertEqual(stats_since(before)[:2], single[:2])
+
+    def test_add_stats(self):
+        before = get_stats()
+        add_stats((Counter(KILLP=2), Counter(LOADED=3), {"clean_name": (1, 2, 3)}))
+        hits, misses, caches = stats_since(before)
+        self.assertEqual(hits, Counter(KILLP=2))
+        self.assertEqual(misses, Counter(LOADED=3))
+        self.assertEqual(caches["clean_name"], (1, 2, 3))
+        self.assertEqual(clean_name.misses - before[2]["clean_name"][1], 2)
+
+
+class TestTail(LogFileTestCase):
+    def test_tail(self):
+        size = os.path.getsize(self.log)
+        for block_size in (50, 1000, 1 << 20):
+            with self.subTest(block_size=block_size):
+                events, end = tail(self.log, 7, keep_fields, block_size)
+                self.assertEqual(events, self.expected[-7:])
+                self.assertEqual(end, size)
+
+    def test_more_than_available(self):
+        events, _ = tail(self.log, len(self.expected) + 10, keep_fields, 100)
+        self.assertEqual(events, self.expected)
+
+    def test_from_end(self):
+        self.assertEqual(
+            tail(self.log, 0, keep_fields), ([], os.path.getsize(self.log))
+        )
+
+    def test_partial_last_line(self):
+        size = os.path.getsize(self.log)
+        with open(self.log, "a", encoding=LOG_ENCODING, newline="") as f:
+            f.write(self.LINES[2])
+        events, end = tail(self.log, 3, keep_fields, 64)
+        self.assertEqual(events, self.expected[-3:])
+        self.assertEqual(end, size)
+
+    def test_dropped(self):
+        self.assertEqual(tail(self.log, 5, drop_all), ([], os.path.getsize(self.log)))
+
+    def test_empty(self):
+        with open(self.log, "w"):
+            pass
+        self.assertEqual(tail(self.log, 5, keep_fields), ([], 0))
+
+
+class TestCompressed(LogFileTestCase):
+    def compress(self, opener, newline=LOG_NEWLINE):
+        data = LOG_NEWLINE.join(self.LINES) + newline
+        with opener(self.log, "wb") as f:
+            f.write(data.encode(LOG_ENCODING))
+
+    def test_formats(self):
+        for opener in (gzip.open, bz2.open, lzma.open):
+            with self.subTest(opener.__module__):
+                self.compress(opener)
+                self.assertIs(get_opener(self.log), opener)
+                self.assertEqual(list(scan(self.log, keep_fields)), self.expected)
+                result = list(scan_parallel(self.log, keep_fields, 3))
+                self.assertEqual(result, self.expected)
+
+    def test_plain(self):
+        self.assertIsNone(get_opener(self.log))
+
+    def test_block_boundaries(self):
+        self.compress(gzip.open)
+        for block_size in (1, 7, 100, 1000):
+            with self.subTest(block_size=block_size):
+                with gzip.open(self.log, "rb") as f:
+                    result = [(e[2], e[0], e[1]) for e in iter_stream(f, block_size)]
+                self.assertEqual(result, self.expected)
+
+    def test_no_final_newline(self):
+        self.compress(gzip.open, newline="")
+        self.assertEqual(list(scan(self.log, keep_fields)), self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
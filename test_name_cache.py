@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import unittest
+
+from main import clean_location, clean_name, get_vehicle
+from name_cache import CACHES, NameCache
+
+NAMES = [
+    "unknown",
+    "Player-123_Name",
+    "PU_Human-NineTails-Grunt-Male-Grunt_10_123456789012",
+    "PU_Human-Xeno-Grunt_123456789012",
+    "PU_Human_Enemy_GroundCombat_NPC_Headhunters_techie_123456789012",
+    "MRAI_Guardian_QI_123456789012",
+    "ANVL_Hornet_F7A_Mk2_PU_AI_CRIM_QIG_1234567890123",
+    "SCItem_Debris_123456789012_ANVL_Arrow_123456789012",
+    "behr_pistol_ballistic_01_123456789012",
+    "OscillationSimple-003",
+    "Hazard-002",
+    "ObjectContainer-ugf_lta_a_0004_drugs",
+    "@Stanton1_Transfer",
+    "Hangar_LrgTop_Exec_123456789012",
+    "SolarSystem_123456789012",
+    "Something_Unknown_123456789012",
+]
+
+
+class TestNameCache(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.cache = NameCache(self.echo, maxsize=3)
+
+    def echo(self, name):
+        self.calls.append(name)
+        return (name, len(name))
+
+    def test_normalized_key(self):
+        self.assertEqual(self.cache("Foo_123456789012"), ("Foo_123456789012", 16))
+        self.assertEqual(self.cache("Foo_999999999999"), ("Foo_999999999999", 16))
+        self.assertEqual(self.calls, ["Foo_123456789012"])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_short_number_not_normalized(self):
+        self.cache("Hazard-002")
+        self.cache("Hazard-003")
+        self.cache("Foo_12345678901")
+        self.cache("Foo_12345678902")
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_with_and_without_id(self):
+        self.assertEqual(self.cache("Foo"), ("Foo", 3))
+        self.assertEqual(self.cache("Foo_123456789012"), ("Foo_123456789012", 16))
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_eviction(self):
+        for name in ("a", "b", "c", "a", "d", "b"):
+            self.cache(name)
+        # "a" was used again before "d" was added, so "b" was dropped
+        self.assertEqual(self.calls, ["a", "b", "c", "d", "b"])
+        self.assertEqual(self.cache.evictions, 2)
+        self.assertEqual(len(self.cache.entries), 3)
+
+    def test_clear(self):
+        self.cache("a")
+        self.cache("a")
+        self.cache.clear()
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
+        self.assertEqual(len(self.cache.entries), 0)
+
+
+class TestCachedCleaners(unittest.TestCase):
+    def test_registered(self):
+        for func in (clean_location, clean_name, get_vehicle):
+            self.assertIs(CACHES[func.__name__], func)
+
+    def test_same_results(self):
+        for func in (clean_location, clean_name, get_vehicle):
+            for template in NAMES:
+                for entity_id in ("123456789012", "987654321098765"):
+                    name = template.replace("123456789012", entity_id)
+                    with self.subTest(func=func.__name__, name=name):
+                        self.assertEqual(func(name), func.__wrapped__(name))
+                        self.assertEqual(func(name), func.__wrapped__(name))
+
+    def test_not_found_cached(self):
+        get_vehicle.clear()
+        self.assertEqual(get_vehicle("Player-123_Name"), ("Player-123_Name", False))
+        self.assertEqual(get_vehicle("Player-123_Name"), ("Player-123_Name", False))
+        self.assertEqual((get_vehicle.hits, get_vehicle.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import unittest
+
+from data import WEAPONS_FPS, WEAPONS_SHIP
+from main import clean_name, clean_tool, get_weapon
+from prefix_index import PrefixIndex
+
+
+class TestPrefixIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = PrefixIndex(
+            {"a_b": 1, "a_b_c": 2, "a_bc": 3, "x": 4}, separator="_"
+        )
+
+    def test_exact(self):
+        self.assertEqual(self.index.longest_prefix("a_b"), ("a_b", 1))
+        self.assertEqual(self.index.longest_prefix("a_b_c"), ("a_b_c", 2))
+
+    def test_longest(self):
+        self.assertEqual(self.index.longest_prefix("a_b_c_d"), ("a_b_c", 2))
+        self.assertEqual(self.index.longest_prefix("a_b_cd"), ("a_b", 1))
+        self.assertEqual(self.index.longest_prefix("x_y_z"), ("x", 4))
+
+    def test_separator_only(self):
+        # Only whole parts count
+        self.assertIsNone(self.index.longest_prefix("a_bcd"))
+        self.assertIsNone(self.index.longest_prefix("xy"))
+        self.assertIsNone(self.index.longest_prefix("a"))
+
+    def test_no_match(self):
+        self.assertIsNone(self.index.longest_prefix(""))
+        self.assertIsNone(self.index.longest_prefix("_a_b"))
+        self.assertIsNone(PrefixIndex({}).longest_prefix("a_b"))
+
+    def test_long_name(self):
+        name = "a_b_c" + "_d" * 100000
+        self.assertEqual(self.index.longest_prefix(name), ("a_b_c", 2))
+
+    def test_mapping(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertIn("a_bc", self.index)
+        self.assertEqual(self.index["x"], 4)
+
+
+class TestWeaponVariants(unittest.TestCase):
+    def test_known(self):
+        for weapons in (WEAPONS_FPS, WEAPONS_SHIP):
+            for weapon_class, weapon in weapons.items():
+                with self.subTest(weapon_class=weapon_class):
+                    self.assertEqual(get_weapon(weapon_class), weapon)
+
+    def test_new_skin(self):
+        self.assertEqual(
+            get_weapon("behr_rifle_ballistic_01_newskin01"), "P4-AR Rifle (Variant)"
+        )
+
+    def test_known_skin_variant(self):
+        self.assertEqual(
+            get_weapon("behr_rifle_ballistic_01_tan01_worn"),
+            'P4-AR "Desert Shadow" Rifle (Variant)',
+        )
+
+    def test_not_weapon(self):
+        self.assertIsNone(get_weapon("behr_rifle"))
+        self.assertIsNone(get_weapon("Something_Unknown"))
+
+    def test_clean_tool(self):
+        self.assertEqual(
+            clean_tool("behr_pistol_ballistic_01_newskin01", "a", "b", "Bullet"),
+            "S-38 Pistol (Variant)",
+        )
+        self.assertEqual(
+            clean_tool("BEHR_LaserCannon_S1_Custom", "a", "b", "Bullet"),
+            "M3A Cannon (Variant)",
+        )
+        self.assertEqual(clean_tool("unknown_gun", "a", "b", "Bullet"), "unknown_gun")
+
+    def test_clean_name(self):
+        self.assertEqual(
+            clean_name("behr_pistol_ballistic_01_newskin01_123456789012"),
+            ("S-38 Pistol (Variant)", 1),
+        )
+        self.assertEqual(
+            clean_name("behr_pistol_ballistic_01_123456789012"), ("S-38 Pistol", 1)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+from contextlib import redirect_stdout
+import io
+import unittest
+from unittest import mock
+
+from terminal_writer import OVERWRITE, TerminalWriter
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestTerminalWriter(unittest.TestCase):
+    def setUp(self):
+        self.stream = CountingStream()
+
+    def test_batches(self):
+        writer = TerminalWriter(self.stream, flush_interval=60)
+        for i in range(100):
+            writer.print(str(i))
+        self.assertEqual(self.stream.getvalue(), "")
+        writer.flush()
+        self.assertEqual(self.stream.getvalue(), "".join(f"{i}\n" for i in range(100)))
+        self.assertEqual(self.stream.writes, 1)
+
+    def test_flush_size(self):
+        writer = TerminalWriter(self.stream, flush_size=10, flush_interval=60)
+        writer.print("12345")
+        self.assertEqual(self.stream.writes, 0)
+        writer.print("67890")
+        self.assertEqual(self.stream.getvalue(), "12345\n67890\n")
+        self.assertEqual(writer.size, 0)
+
+    def test_flush_interval(self):
+        writer = TerminalWriter(self.stream, flush_interval=1.0)
+        with mock.patch("time.monotonic", return_value=100.0):
+            writer.print("one")
+        self.assertEqual(self.stream.getvalue(), "")
+        with mock.patch("time.monotonic", return_value=100.5):
+            writer.print("two")
+        self.assertEqual(self.stream.getvalue(), "")
+        with mock.patch("time.monotonic", return_value=101.0):
+            writer.print("three")
+        self.assertEqual(self.stream.getvalue(), "one\ntwo\nthree\n")
+
+    def test_write(self):
+        with TerminalWriter(self.stream) as writer:
+            writer.write("\x1b[1A")
+            writer.print("line")
+        self.assertEqual(self.stream.getvalue(), "\x1b[1Aline\n")
+
+    def test_flush_empty(self):
+        TerminalWriter(self.stream).flush()
+        self.assertEqual(self.stream.writes, 0)
+
+    def test_stdout(self):
+        writer = TerminalWriter()
+        with redirect_stdout(io.StringIO()) as stdout:
+            writer.print("line")
+            writer.flush()
+        self.assertEqual(stdout.getvalue(), "line\n")
+
+
+class TestUpdates(unittest.TestCase):
+    def setUp(self):
+        self.stream = CountingStream()
+        self.writer = TerminalWriter(
+            self.stream, flush_interval=60, update_interval=1.0
+        )
+
+    def test_replaced(self):
+        self.writer.print("line")
+        for i in range(10):
+            self.writer.update(f"step {i}", over=i > 0)
+        self.writer.flush()
+        self.assertEqual(self.stream.getvalue(), "line\nstep 9\n")
+
+    def test_replaced_over(self):
+        self.writer.update("step 0", over=False)
+        self.writer.flush()
+        for i in range(1, 10):
+            self.writer.update(f"step {i}")
+        self.writer.flush()
+        self.assertEqual(self.stream.getvalue(), f"step 0\n{OVERWRITE}step 9\n")
+        self.assertEqual(self.stream.writes, 2)
+
+    def test_not_over(self):
+        self.writer.update("a")
+        self.writer.update("b", over=False)
+        self.writer.flush()
+        self.assertEqual(self.stream.getvalue(), f"{OVERWRITE}a\nb\n")
+
+    def test_after_line(self):
+        self.writer.update("a", over=False)
+        self.writer.print("line")
+        self.writer.update("b")
+        self.writer.flush()
+        self.assertEqual(self.stream.getvalue(), f"a\nline\n{OVERWRITE}b\n")
+
+    def test_held(self):
+        with mock.patch("time.monotonic", return_value=100.0):
+            self.writer.update("step 1", over=False)
+            self.writer.flush(hold_update=True)
+        self.assertEqual(self.stream.getvalue(), "step 1\n")
+        with mock.patch("time.monotonic", return_value=100.5):
+            self.writer.update("step 2")
+            self.writer.flush(hold_update=True)
+            self.writer.update("step 3")
+            self.writer.flush(hold_update=True)
+        self.assertEqual(self.stream.getvalue(), "step 1\n")
+        with mock.patch("time.monotonic", return_value=101.0):
+            self.writer.flush(hold_update=True)
+        self.assertEqual(self.stream.getvalue(), f"step 1\n{OVERWRITE}step 3\n")
+        self.assertEqual(self.stream.writes, 2)
+
+    def test_held_until_line(self):
+        with mock.patch("time.monotonic", return_value=100.0):
+            self.writer.update("step 1", over=False)
+            self.writer.flush(hold_update=True)
+            self.writer.update("step 2")
+            self.writer.print("line")
+            self.writer.flush(hold_update=True)
+        self.assertEqual(self.stream.getvalue(), f"step 1\n{OVERWRITE}step 2\nline\n")
+
+    def test_held_written_on_flush(self):
+        with mock.patch("time.monotonic", return_value=100.0):
+            self.writer.update("step 1", over=False)
+            self.writer.flush(hold_update=True)
+            self.writer.update("15/15")
+            self.writer.flush(hold_update=True)
+            self.assertEqual(self.stream.getvalue(), "step 1\n")
+            self.writer.flush()
+        self.assertEqual(self.stream.getvalue(), f"step 1\n{OVERWRITE}15/15\n")
+
+    def test_held_until_interval(self):
+        writer = TerminalWriter(self.stream, flush_interval=0.1, update_interval=1.0)
+        with mock.patch("time.monotonic", return_value=100.0):
+            writer.update("step 1", over=False)
+            writer.flush(hold_update=True)
+            writer.update("step 2")
+        with mock.patch("time.monotonic", return_value=100.5):
+            writer.update("step 3")
+        self.assertEqual(self.stream.getvalue(), "step 1\n")
+        with mock.patch("time.monotonic", return_value=101.0):
+            writer.update("step 4")
+        self.assertEqual(self.stream.getvalue(), f"step 1\n{OVERWRITE}step 4\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,698 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the log parser.
+
+Generates a synthetic Game.log of the requested size (or uses an existing one)
+and reports throughput for each stage being measured.
+
+Usage:
+    python tools/benchmark.py generate bench.log --size 300
+    python tools/benchmark.py dispatch bench.log
+    python tools/benchmark.py bytes bench.log
+    python tools/benchmark.py parallel bench.log --workers 1 2 4 8
+    python tools/benchmark.py follow
+    python tools/benchmark.py reader bench.log
+    python tools/benchmark.py compressed bench.log
+    python tools/benchmark.py names
+    python tools/benchmark.py vehicles
+    python tools/benchmark.py memory
+    python tools/benchmark.py stages bench.log
+    python tools/benchmark.py output bench.log
+    python tools/benchmark.py colors
+"""
+
+from argparse import ArgumentParser
+import bz2
+from datetime import datetime, timedelta
+import gzip
+import io
+import lzma
+import os
+import shutil
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from io import TextIOWrapper
+from collections.abc import Callable, Generator, Iterable
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_parser import (  # noqa: E402
+    LOG_ENCODING,
+    LOG_NEWLINE,
+    PREFIX_LEN,
+    ParsedLines,
+    SCLogParser,
+)
+from log_follower import Follower, InotifyWatcher, PollWatcher, follow  # noqa: E402
+from colorize import Color  # noqa: E402
+from entity_table import EntityTable  # noqa: E402
+from events import make_event  # noqa: E402
+from log_reader import scan, scan_parallel  # noqa: E402
+from main import (  # noqa: E402
+    RE_SHIP_DEBRIS,
+    RE_VEHICLE_NAME,
+    RENDERER,
+    clean_location,
+    clean_name,
+    get_debris_ship,
+    get_vehicle,
+    print_events,
+    split_vehicle_name,
+)
+from terminal_writer import TerminalWriter  # noqa: E402
+
+EVENT_LINES = [
+    "[Notice] <Actor Death> CActor::Kill: 'PU_Human-NineTails-Grunt-Male-Grunt_10_123456789012' [123456789012] in zone 'OOC_Stanton_3a_Lyria' killed by 'Player-123_Name' [123456789012] using 'GATS_BallisticGatling_Mounted_S1_123456789012' [Class GATS_BallisticGatling_Mounted_S1] with damage type 'Bullet' from direction x: -0.123456, y: -0.123456, z: 0.123456 [Team_ActorTech][Actor]",
+    "[Notice] <Vehicle Destruction> CVehicle::OnAdvanceDestroyLevel: Vehicle 'MRAI_Guardian_QI_123456789012' [123456789012] in zone 'OOC_Stanton_3a_Lyria' [pos x: -200000.000000, y: 100000.000000, z: 60000.000000 vel x: 0.000000, y: 0.000000, z: 0.000000] driven by 'unknown' [0] advanced from destroy level 1 to 2 caused by 'Player-123_Name' [123456789012] with 'Combat' [Team_VehicleFeatures][Vehicle]",
+    "[Notice] <Corpse> Player 'Player-123_Name' <remote client>: DoesLocationContainHospital: Searching landing zone location \"@Stanton1b_Aberdeen_Prison\" for the closest hospital. [Team_ActorTech][Actor]",
+    '[Notice] <ContextEstablisherTaskFinished> establisher="CReplicationModel" message="CET completed" taskname="StreamingFinished" state=eCVS_InGame(15) status="Finished" runningTime=42.5 numRuns=1 map="megamap" gamerules="SC_Default" sessionId="00000000" [Team_Network][Network][Replication][Loading][Persistence]',
+    "Logged an incap.! nickname: Player-123_Name, causes: [Bleed (0.350000 damage)]",
+    "[CSessionManager::OnClientSpawned] Spawned!",
+    "Loading screen for pu : SC_Frontend closed after 52.13 seconds",
+]
+
+NOISE_LINES = [
+    "[Notice] <Ship Interactions> CSCItem::OnInteractableFocus: Player 'Player-123_Name' focused on 'Door_Hangar_123456789012' [Team_ShipFeatures][Interaction]",
+    "[Notice] <CEntityComponentInstancedInterior::OnEntityLeaveZone> [InstancedInterior] OnEntityLeaveZone - InstancedInterior [Team_CoreGameplayFeatures][Cargo]",
+    "[Notice] <Actor stall> Actor stall detected, Player: Player-123_Name, Type: downstream, Length: 1.042381. [Team_ActorTech][Actor]",
+    "[Notice] <Vehicle Control Flow> CVehicleMovementBase::SetDriver: Local client node [123456789012] requesting control token for 'ANVL_Arrow_123456789012' [123456789012] [Team_VehicleFeatures][Vehicle]",
+    "[Trace] @session: 'c0ffee' @cache: 'FHY9-123' @gamelog: 'foo' Preparing to stream",
+    "[CGlobalGameUI::OnLoadingScreenStep] Step 7",
+    "Loading object container ObjectContainer-ugf_lta_a_0003",
+    "[Error] Could not find material 'objects/ships/anvl/arrow/decal.mtl'",
+    "<AttachmentReceived> Player[Player-123_Name] Attachment[body_01_noMagicPocket_123456789012, Clothing] Status[persistent] Port[Body_ItemPort]",
+    "CEntity::OnGenerateComponent: hello world, this line is a long one full of noise that matches nothing in particular at all",
+]
+
+
+def generate_log(filepath: str, size_mb: int, event_ratio: float = 0.02) -> None:
+    """
+    Writes a synthetic Game.log of roughly `size_mb` megabytes.
+
+    Args:
+        filepath: Where to write the log.
+        size_mb: Target size in megabytes.
+        event_ratio: Fraction of lines that are parseable events.
+    """
+    rng = random.Random(0)
+    target = size_mb * 1024 * 1024
+    written = 0
+    second = 0
+    with open(filepath, "w", encoding=LOG_ENCODING, newline="") as f:
+        while written < target:
+            chunk = []
+            for _ in range(10_000):
+                second += 1
+                ms = rng.randrange(1000)
+                body = rng.choice(
+                    EVENT_LINES if rng.random() < event_ratio else NOISE_LINES
+                )
+                chunk.append(
+                    f"<2024-12-23T{second // 3600 % 24:02}:{second // 60 % 60:02}:{second % 60:02}.{ms:03}Z> {body}{LOG_NEWLINE}"
+                )
+            data = "".join(chunk)
+            f.write(data)
+            written += len(data)
+
+
+def find_match_linear(line: str) -> tuple[str, re.Match] | None:
+    """The original find_match: try every pattern in turn."""
+    for event_type, regex in SCLogParser.PATTERNS.items():
+        if match := regex.match(line, PREFIX_LEN):
+            return (event_type, match)
+    return None
+
+
+def read_lines(filepath: str) -> list[str]:
+    with open(filepath, "r", encoding=LOG_ENCODING, newline=LOG_NEWLINE) as f:
+        return f.readlines()
+
+
+def time_lines(name: str, func: Callable[[str], object], lines: Iterable[str]) -> int:
+    count = 0
+    hits = 0
+    start = time.perf_counter()
+    for line in lines:
+        count += 1
+        if func(line):
+            hits += 1
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:>12}: {count / elapsed:>12,.0f} lines/s  ({count:,} lines, {hits:,} events, {elapsed:.2f}s)"
+    )
+    return hits
+
+
+def bench_dispatch(filepath: str) -> None:
+    lines = read_lines(filepath)
+    time_lines("linear", find_match_linear, lines)
+    time_lines("dispatch", SCLogParser.find_match, lines)
+
+
+def scan_text(filepath: str) -> Generator[tuple, None, None]:
+    with open(filepath, "r", encoding=LOG_ENCODING, newline=LOG_NEWLINE) as f:
+        for line in f:
+            if match := SCLogParser.find_match(line):
+                yield (match[0], match[1].groups(), match[2])
+
+
+def scan_bytes(
+    filepath: str, chunk_size: int = 1 << 20
+) -> Generator[tuple, None, None]:
+    with open(filepath, "rb") as f:
+        rest = b""
+        while chunk := f.read(chunk_size):
+            buf = rest + chunk
+            consumed = yield from SCLogParser.iter_bytes(buf)
+            rest = buf[consumed:]
+
+
+def time_scan(name: str, scan: Generator[tuple, None, None], size: int) -> list:
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    events = list(scan)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - start_cpu
+    # Everything is decoded in text mode; only the prefix and fields in bytes mode
+    decoded = (
+        size
+        if name == "text"
+        else sum(PREFIX_LEN + sum(map(len, e[1])) for e in events)
+    )
+    print(
+        f"{name:>12}: {size / elapsed / 2**20:>8.1f} MB/s  cpu {cpu:.2f}s  decoded {decoded / 2**20:,.1f} MB  ({len(events):,} events)"
+    )
+    return events
+
+
+def bench_bytes(filepath: str) -> None:
+    size = os.path.getsize(filepath)
+    text = time_scan("text", scan_text(filepath), size)
+    raw = time_scan("bytes", scan_bytes(filepath), size)
+    if text != raw:
+        print("Events differ between text and bytes mode!")
+
+
+def bench_parallel(filepath: str, workers: list[int]) -> None:
+    size = os.path.getsize(filepath)
+    baseline = None
+    for count in workers:
+        start = time.perf_counter()
+        events = sum(1 for _ in scan_parallel(filepath, RENDERER.format, count))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"{count:>3} workers: {size / elapsed / 2**20:>8.1f} MB/s  {elapsed:.2f}s  speedup {baseline / elapsed:.2f}x  ({events:,} events)"
+        )
+
+
+class SleepWatcher(PollWatcher):
+    """The original follow(): sleep for a second whenever there's nothing new."""
+
+    def wait(self) -> None:
+        time.sleep(1)
+
+
+def measure_follow(name: str, make_watcher: Callable, lines: int, idle: float) -> None:
+    fd, filepath = tempfile.mkstemp(suffix=".log")
+    latencies = []
+    done = threading.Event()
+
+    def read() -> None:
+        with open(filepath, "rb") as f:
+            for line in follow(f, make_watcher(filepath)):
+                if line == "stop" + LOG_NEWLINE:
+                    break
+                latencies.append(time.perf_counter() - float(line))
+                if len(latencies) == lines:
+                    done.set()
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    rng = random.Random(0)
+    with os.fdopen(fd, "w", encoding=LOG_ENCODING, newline="") as f:
+        for _ in range(lines):
+            time.sleep(rng.uniform(0.005, 0.1))
+            f.write(f"{time.perf_counter()}{LOG_NEWLINE}")
+            f.flush()
+        done.wait()
+
+        # Nothing is written now, so after the backoff settles this is the CPU
+        # time the follower spends idle
+        time.sleep(2)
+        start_cpu = time.process_time()
+        time.sleep(idle)
+        idle_cpu = time.process_time() - start_cpu
+
+        f.write("stop" + LOG_NEWLINE)
+    reader.join()
+    os.remove(filepath)
+
+    p50 = statistics.median(latencies)
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(
+        f"{name:>12}: p50 {p50 * 1000:>7.1f} ms  p99 {p99 * 1000:>7.1f} ms  idle cpu {idle_cpu / idle * 1000:.2f} ms/s"
+    )
+
+
+def bench_follow(lines: int, idle: float) -> None:
+    measure_follow("sleep(1)", lambda _: SleepWatcher(), lines, idle)
+    measure_follow("poll", lambda _: PollWatcher(), lines, idle)
+    if sys.platform.startswith("linux"):
+        measure_follow("inotify", InotifyWatcher, lines, idle)
+
+
+def bench_reader(filepath: str) -> None:
+    """Reads a whole file the way follow() does: per line, and in blocks."""
+    size = os.path.getsize(filepath)
+
+    def readline() -> int:
+        # The loop of the original follow(), up to the end of the file
+        def lines(f: TextIOWrapper) -> Generator[str, None, None]:
+            while line := f.readline():
+                yield line
+
+        with open(filepath, "r", encoding=LOG_ENCODING, newline=LOG_NEWLINE) as f:
+            return sum(1 for _ in lines(f))
+
+    def blocks() -> int:
+        with open(filepath, "rb") as f:
+            follower = Follower(f, PollWatcher())
+            count = sum(1 for _ in follower.poll())
+            follower.close()
+            return count
+
+    for name, read in (("readline", readline), ("blocks", blocks)):
+        start = time.perf_counter()
+        lines = read()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>10}: {size / elapsed / 2**20:>8.1f} MB/s  {lines / elapsed / 1e6:.2f}M lines/s  ({lines:,} lines)"
+        )
+
+
+def bench_compressed(filepath: str) -> None:
+    """Scans a log compressed with each codec, with RENDERER.format."""
+    size = os.path.getsize(filepath)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, opener in (
+            ("plain", open),
+            ("gzip", gzip.open),
+            ("bz2", bz2.open),
+            ("xz", lzma.open),
+        ):
+            compressed = os.path.join(directory, "Game.log." + name)
+            with open(filepath, "rb") as src, opener(compressed, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            start = time.perf_counter()
+            events = sum(1 for _ in scan(compressed, RENDERER.format))
+            elapsed = time.perf_counter() - start
+            ratio = os.path.getsize(compressed) / size
+            print(
+                f"{name:>6}: {size / elapsed / 2**20:>6.1f} MB/s of log  {elapsed:.2f}s  size {ratio:>6.1%}  ({events:,} events)"
+            )
+            os.remove(compressed)
+
+
+# Names as they appear in kill events, each with a new entity ID every time
+ENTITY_NAMES = [
+    "Player-123_Name",
+    "PU_Human-NineTails-Grunt-Male-Grunt_10_{}",
+    "PU_Human_Enemy_GroundCombat_NPC_Headhunters_techie_{}",
+    "MRAI_Guardian_QI_{}",
+    "ANVL_Hornet_F7A_Mk2_PU_AI_CRIM_QIG_{}",
+    "behr_pistol_ballistic_01_{}",
+    "OOC_Stanton_3a_Lyria",
+    "Hangar_LrgTop_Exec_{}",
+    "Something_Unknown_{}",
+]
+
+
+def bench_names(count: int) -> None:
+    """Calls the name cleaners on repeating entities, with and without cache."""
+    rng = random.Random(0)
+    names = [
+        rng.choice(ENTITY_NAMES).format(rng.randrange(10**12, 10**13))
+        for _ in range(count)
+    ]
+    for func in (clean_name, clean_location, get_vehicle):
+        for name, call in (("uncached", func.__wrapped__), ("cached", func)):
+            func.clear()
+            start = time.perf_counter()
+            for entity in names:
+                call(entity)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{func.__name__:>14} {name:>8}: {elapsed / count * 1e9:>7.0f} ns/call"
+            )
+
+
+# Names that don't match, built to make the vehicle regexes backtrack
+ADVERSARIAL_NAMES = {
+    "underscores": "A_",
+    "short ids": "_12345678901",
+    "ai suffixes": "_PU_AI_CRIM",
+    "debris": "_PU_x",
+}
+
+
+def bench_vehicles(sizes: list[int]) -> None:
+    """Parses adversarial vehicle names with the regexes and without."""
+
+    def regexes(name: str) -> None:
+        RE_VEHICLE_NAME.match(name)
+        RE_SHIP_DEBRIS.match(name)
+
+    def linear(name: str) -> None:
+        split_vehicle_name(name)
+        get_debris_ship(name)
+
+    for case, unit in ADVERSARIAL_NAMES.items():
+        for size in sizes:
+            name = unit * (size // len(unit))
+            if case == "debris":
+                name = "SCItem_Debris_123456789012_" + name
+            results = []
+            for parse in (regexes, linear):
+                repeat = max(1, 200_000 // size)
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    parse(name)
+                results.append((time.perf_counter() - start) / repeat)
+            print(
+                f"{case:>12} {len(name):>6} chars: regex {results[0] * 1e6:>9.1f} us  linear {results[1] * 1e6:>7.1f} us"
+            )
+
+
+def traced(build: Callable[[], Any]) -> tuple[Any, int]:
+    """
+    Returns:
+        A tuple (result, size) of what build() returns, and how many bytes
+        allocated while building it are still in use.
+    """
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (result, size)
+
+
+def bench_memory(count: int, entities: int) -> None:
+    """
+    Keeps a session of kill events in memory, as the tuples the parser yields,
+    as ParsedLines, whose fields are IDs in an EntityTable, and as event
+    records with and without their names interned in one, and cleans the
+    killers' names per event and per distinct name.
+    """
+    rng = random.Random(0)
+    names = [
+        rng.choice(ENTITY_NAMES).format(rng.randrange(10**12, 10**13))
+        for _ in range(entities)
+    ]
+    zones = [f"OOC_Stanton_{i}a_Zone" for i in range(entities // 10 or 1)]
+    weapons = ["behr_rifle_ballistic_01", "GATS_BallisticGatling_Mounted_S1"]
+    # As undecoded fields, so that each event decodes its own strings
+    raw = [
+        tuple(
+            field.encode(LOG_ENCODING)
+            for field in (
+                rng.choice(names),
+                rng.choice(zones),
+                rng.choice(names),
+                rng.choice(weapons),
+                "Bullet",
+                "x: -0.123456, y: -0.123456, z: 0.123456",
+            )
+        )
+        for _ in range(count)
+    ]
+    start = datetime(2024, 12, 23)
+
+    def decoded() -> Generator[tuple[str, tuple[str, ...], datetime], None, None]:
+        for i, fields in enumerate(raw):
+            yield (
+                "KILLP",
+                tuple(field.decode(LOG_ENCODING) for field in fields),
+                start + timedelta(seconds=i),
+            )
+
+    def columns() -> ParsedLines:
+        lines = ParsedLines()
+        for event in decoded():
+            lines.append(*event)
+        return lines
+
+    events, tuples_size = traced(lambda: list(decoded()))
+    lines, columns_size = traced(columns)
+    print(f"{count} events, {len(lines.entities)} distinct fields")
+    print(f"{'tuples':>20}: {tuples_size / 1024:>9.0f} KiB")
+    print(f"{'ParsedLines':>20}: {columns_size / 1024:>9.0f} KiB")
+
+    _, records_size = traced(lambda: [make_event(*event) for event in decoded()])
+    table = EntityTable()
+    _, interned_size = traced(
+        lambda: [make_event(*event, table) for event in decoded()]
+    )
+    print(f"{'records':>20}: {records_size / 1024:>9.0f} KiB")
+    print(f"{'records interned':>20}: {interned_size / 1024:>9.0f} KiB")
+
+    clean_name.clear()
+    _, per_event = traced(lambda: [clean_name(event[1][2])[0] for event in events])
+    clean_name.clear()
+    (cleaned, ids), per_name = traced(
+        lambda: lines.entities.map(lambda name: clean_name(name)[0])
+    )
+    print(f"{'clean per event':>20}: {per_event / 1024:>9.0f} KiB")
+    print(
+        f"{'clean per name':>20}: {per_name / 1024:>9.0f} KiB, {len(cleaned)} distinct"
+    )
+
+
+def bench_stages(filepath: str) -> None:
+    """Times parsing, making event records and rendering them, separately."""
+    with open(filepath, "rb") as f:
+        buf = f.read()
+    size = len(buf)
+
+    start = time.perf_counter()
+    events = list(SCLogParser.iter_buffer(buf))
+    parsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = [make_event(*event) for event in events]
+    made = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lines = [RENDERER.render(record) for record in records]
+    rendered = time.perf_counter() - start
+
+    print(f"{len(events)} events, {sum(1 for line in lines if line)} rendered")
+    for name, elapsed in (("parse", parsed), ("records", made), ("render", rendered)):
+        print(
+            f"{name:>8}: {elapsed:6.2f} s  {size / elapsed / 1e6:8.1f} MB/s  "
+            f"{elapsed / len(events) * 1e6:6.2f} us/event"
+        )
+
+
+class CountingRaw(io.RawIOBase):
+    """Discards what's written, counting the writes, like a terminal would get."""
+
+    def __init__(self) -> None:
+        self.writes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.writes += 1
+        return len(b)
+
+
+def bench_output(filepath: str) -> None:
+    """Prints the rendered events of a log line by line, and batched."""
+    events = [
+        (event_type, text) for _, event_type, text in scan(filepath, RENDERER.format)
+    ]
+
+    def terminal() -> tuple[CountingRaw, TextIOWrapper]:
+        raw = CountingRaw()
+        return (raw, TextIOWrapper(io.BufferedWriter(raw), line_buffering=True))
+
+    raw, stream = terminal()
+    start = time.perf_counter()
+    for _, text in events:
+        print(text, file=stream)
+    elapsed = time.perf_counter() - start
+    print(f"{'print':>8}: {elapsed:6.3f} s  {raw.writes:>8} writes")
+
+    raw, stream = terminal()
+    start = time.perf_counter()
+    with TerminalWriter(stream) as output:
+        print_events(events, output=output)
+    elapsed = time.perf_counter() - start
+    print(f"{'batched':>8}: {elapsed:6.3f} s  {raw.writes:>8} writes")
+
+
+def color_linear(
+    color: Color,
+    text: str,
+    bold: bool = False,
+    bg: Color | None = None,
+    bg_bold: bool = False,
+) -> str:
+    """The original Color.__call__: build the sequence on every call."""
+    if not any([bold, bg, bg_bold]):
+        return f"{color.set()}{text}{color.reset()}"
+    color_codes = [str(color.value + 30 + (60 if bold else 0))]
+    if bg:
+        color_codes.append(str(bg.value + 40 + (60 if bg_bold else 0)))
+    return f'\x1b[{";".join(color_codes)}m{text}\x1b[0m'
+
+
+def parse_linear(text: str) -> str:
+    """The original Color.parse: a str.replace() over the text for each tag."""
+    color_map = {
+        "K": Color.BLACK,
+        "R": Color.RED,
+        "G": Color.GREEN,
+        "Y": Color.YELLOW,
+        "B": Color.BLUE,
+        "M": Color.MAGENTA,
+        "C": Color.CYAN,
+        "W": Color.WHITE,
+    }
+    tags = re.findall(r"\(([XKRGYBMCW][fb]?)\)", text)
+    for tag in tags:
+        if tag[0] == "X":
+            text = text.replace(f"({tag})", Color.reset())
+        else:
+            c = color_map[tag[0]]
+            if len(tag) == 2 and tag[1] == "b":
+                text = text.replace(f"({tag})", c.set(fg=False, bg=True))
+            else:
+                text = text.replace(f"({tag})", c.set())
+    return text
+
+
+def bench_colors(count: int) -> None:
+    """Colors text the way the renderer does, and parses tags, old and new."""
+    calls = [
+        ("plain", {}),
+        ("bold", {"bold": True}),
+        ("bg", {"bg": Color.RED}),
+        ("bg bold", {"bold": True, "bg": Color.RED, "bg_bold": True}),
+    ]
+    for name, kwargs in calls:
+        results = []
+        for call in (color_linear, Color.__call__):
+            start = time.perf_counter()
+            for _ in range(count):
+                call(Color.YELLOW, "Player-123_Name", **kwargs)
+            results.append((time.perf_counter() - start) / count)
+        print(
+            f"{name:>8}: original {results[0] * 1e9:>6.0f} ns  cached {results[1] * 1e9:>6.0f} ns"
+        )
+    texts = [
+        ("no tags", "A line of text without any tags in it at all"),
+        ("2 tags", "(R)Killed(X) by someone"),
+        ("8 tags", "(Rb)(W)A(X) (G)B(X) (Yf)C(X) (Cb)D(X)"),
+        ("40 tags", "(Rb)(W)A(X) (G)B(X) (Yf)C(X) (Cb)D(X)" * 5),
+    ]
+    for name, text in texts:
+        results = []
+        for parse in (parse_linear, Color.parse):
+            start = time.perf_counter()
+            for _ in range(count // 10):
+                parse(text)
+            results.append((time.perf_counter() - start) / (count // 10))
+        print(
+            f"{name:>8}: original {results[0] * 1e9:>6.0f} ns  one pass {results[1] * 1e9:>6.0f} ns"
+        )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("generate", help="write a synthetic Game.log")
+    p.add_argument("file")
+    p.add_argument("--size", type=int, default=300, help="size in MB")
+    p.add_argument("--events", type=float, default=0.02, help="event line ratio")
+
+    p = subparsers.add_parser("dispatch", help="find_match: linear vs dispatch")
+    p.add_argument("file")
+
+    p = subparsers.add_parser("bytes", help="text vs bytes mode, full scan")
+    p.add_argument("file")
+
+    p = subparsers.add_parser("parallel", help="scan_parallel with RENDERER.format")
+    p.add_argument("file")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+
+    p = subparsers.add_parser("follow", help="write-to-display latency of follow()")
+    p.add_argument("--lines", type=int, default=200)
+    p.add_argument("--idle", type=float, default=5.0, help="seconds of idle time")
+
+    p = subparsers.add_parser("reader", help="readline() vs block reads in follow()")
+    p.add_argument("file")
+
+    p = subparsers.add_parser("compressed", help="scan throughput for each codec")
+    p.add_argument("file")
+
+    p = subparsers.add_parser("names", help="name cleaners with and without cache")
+    p.add_argument("--count", type=int, default=200_000)
+
+    p = subparsers.add_parser("vehicles", help="vehicle names: regex vs linear")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+
+    p = subparsers.add_parser("memory", help="event history: tuples vs interned")
+    p.add_argument("--count", type=int, default=200_000, help="events")
+    p.add_argument("--entities", type=int, default=300, help="distinct names")
+
+    p = subparsers.add_parser("stages", help="parse, records and render, apart")
+    p.add_argument("file")
+
+    p = subparsers.add_parser("output", help="print() per line vs TerminalWriter")
+    p.add_argument("file")
+
+    p = subparsers.add_parser("colors", help="Color() and Color.parse(), cached")
+    p.add_argument("--count", type=int, default=500_000)
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate_log(args.file, args.size, args.events)
+    elif args.command == "dispatch":
+        bench_dispatch(args.file)
+    elif args.command == "bytes":
+        bench_bytes(args.file)
+    elif args.command == "parallel":
+        bench_parallel(args.file, args.workers)
+    elif args.command == "follow":
+        bench_follow(args.lines, args.idle)
+    elif args.command == "reader":
+        bench_reader(args.file)
+    elif args.command == "compressed":
+        bench_compressed(args.file)
+    elif args.command == "names":
+        bench_names(args.count)
+    elif args.command == "vehicles":
+        bench_vehicles(args.sizes)
+    elif args.command == "memory":
+        bench_memory(args.count, args.entities)
+    elif args.command == "stages":
+        bench_stages(args.file)
+    elif args.command == "output":
+        bench_output(args.file)
+    elif args.command == "colors":
+        bench_colors(args.count)
+
+# vim: set expandtab ts=4 sw=4